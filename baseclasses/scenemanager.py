@@ -1,5 +1,7 @@
 from __future__ import annotations
+from typing import Optional
 from abc import ABC, abstractmethod
+import time
 import pygame
 
 from utilities.decorators import singleton
@@ -7,9 +9,22 @@ from utilities.typehints import ActionBuffer, MouseBuffer, InputBuffer
 
 
 class Scene(ABC):
+    # Names in config.assets.LOADERS the scene uses, so they can be loaded
+    # before switching to it
+    ASSETS: tuple[str, ...] = ()
+
     def __init__(self, scene_manager: SceneManager) -> None:
         self.scene_manager = scene_manager
 
+    def frame_ms_left(self, budget_ms: float) -> float:
+        """
+        Returns: What's left of budget_ms since the frame's first update, for
+        work budgeted per frame rather than per update.
+        """
+
+        elapsed = time.perf_counter() - self.scene_manager.frame_start
+        return budget_ms - elapsed * 1000
+
     @abstractmethod
     def handle_input(
         self, action_buffer: ActionBuffer, mouse_buffer: MouseBuffer
@@ -18,13 +33,20 @@ class Scene(ABC):
     @abstractmethod
     def update(self, dt: float) -> None: ...
 
+    # alpha is how far the frame is between the last update and the next, for
+    # drawing movement smoothly when frames and updates don't line up. Returns
+    # the regions of surface that changed, or None if all of it might have
     @abstractmethod
-    def render(self, surface: pygame.Surface) -> None: ...
+    def render(
+        self, surface: pygame.Surface, alpha: float
+    ) -> Optional[list[pygame.Rect]]: ...
 
 
 @singleton
 class SceneManager:
     switched = False  # To ensure scene does not switch mid game loop
+    # When the current frame's first update started, a frame can run several
+    frame_start = 0.0
 
     def __init__(self, starting_scene: Scene) -> None:
         self.switch_scene(starting_scene)
@@ -44,7 +66,9 @@ class SceneManager:
             return
         self.scene.update(dt)
 
-    def render(self, surface: pygame.Surface) -> None:
+    def render(
+        self, surface: pygame.Surface, alpha: float = 1.0
+    ) -> Optional[list[pygame.Rect]]:
         if self.switched:
-            return
-        self.scene.render(surface)
+            return None
+        return self.scene.render(surface, alpha)
@@ -0,0 +1,82 @@
+"""
+Differential test and timing of find_attacks against filtering with the
+reference is_attack, on positions from every level. Like pick_random_move,
+only legal moves of positions without captures are checked.
+
+Usage: python -m benchmarks.attacks [positions per level]
+"""
+
+import sys
+import time
+
+from components.chess import (
+    generate_pseudo_moves,
+    find_legal_moves,
+    find_captures,
+    find_attacks,
+    is_attack,
+)
+from components.levels import levels
+from benchmarks.positions import generate_position
+
+# Below this share of non-attacks the incremental paths for captures a move
+# blocks or uncovers barely get checked
+MIN_QUIET_SHARE = 0.25
+
+
+def benchmark_level(level: dict, positions: int) -> tuple[int, int, float, float]:
+    moves = 0
+    attacks = 0
+    attack_time = 0.0
+    reference_time = 0.0
+
+    for seed in range(positions):
+        board, player_pieces, players = generate_position(level, seed, seed % 40)
+        for colour in players:
+            pseudo_moves = generate_pseudo_moves(board, player_pieces, colour)
+            legal_moves = find_legal_moves(board, player_pieces, colour, pseudo_moves)
+            # pick_random_move takes a capture if there is one
+            if find_captures(legal_moves):
+                continue
+
+            start = time.perf_counter()
+            attack_moves = find_attacks(board, player_pieces, colour, legal_moves)
+            attack_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            reference_moves = [
+                move
+                for move in legal_moves
+                if is_attack(board, player_pieces, colour, move)
+            ]
+            reference_time += time.perf_counter() - start
+
+            if list(attack_moves) != reference_moves:
+                raise AssertionError(
+                    f"{level['name']} seed {seed} {colour}: attacks differ"
+                )
+            moves += len(legal_moves)
+            attacks += len(attack_moves)
+
+    if moves - attacks < moves * MIN_QUIET_SHARE:
+        raise AssertionError(
+            f"{level['name']}: only {moves - attacks} of {moves} moves aren't attacks"
+        )
+    return moves, attacks, attack_time, reference_time
+
+
+def main() -> None:
+    positions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    print(f"{'LEVEL':<22}{'MOVES':>8}{'ATTACKS':>9}{'ATTACKS ms':>12}", end="")
+    print(f"{'IS_ATTACK ms':>14}{'SPEEDUP':>9}")
+    for level in levels:
+        moves, attacks, attack, reference = benchmark_level(level, positions)
+        print(
+            f"{level['name']:<22}{moves:>8}{attacks:>9}{attack * 1000:>12.1f}"
+            f"{reference * 1000:>14.1f}{reference / attack:>8.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
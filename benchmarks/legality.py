@@ -0,0 +1,65 @@
+"""
+Compares find_legal_moves against filtering with the reference is_legal on
+positions from every level. Also fails loudly if they ever disagree.
+
+Usage: python -m benchmarks.legality [positions per level]
+"""
+
+import sys
+import time
+
+from components.chess import generate_pseudo_moves, find_legal_moves, is_legal
+from components.levels import levels
+from benchmarks.positions import generate_position
+
+
+def benchmark_level(level: dict, positions: int) -> tuple[int, float, float, float]:
+    moves = 0
+    pseudo_time = 0.0
+    legal_time = 0.0
+    reference_time = 0.0
+
+    for seed in range(positions):
+        board, player_pieces, players = generate_position(level, seed, seed % 40)
+        for colour in players:
+            start = time.perf_counter()
+            pseudo_moves = generate_pseudo_moves(board, player_pieces, colour)
+            pseudo_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            legal_moves = find_legal_moves(board, player_pieces, colour, pseudo_moves)
+            legal_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            reference_moves = [
+                move
+                for move in pseudo_moves
+                if is_legal(board, player_pieces, colour, move)
+            ]
+            reference_time += time.perf_counter() - start
+
+            if list(legal_moves) != reference_moves:
+                raise AssertionError(
+                    f"{level['name']} seed {seed} {colour}: legal moves differ"
+                )
+            moves += len(pseudo_moves)
+
+    return moves, pseudo_time, legal_time, reference_time
+
+
+def main() -> None:
+    positions = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    print(f"{'LEVEL':<22}{'MOVES':>8}{'PSEUDO ms':>11}{'LEGAL ms':>10}", end="")
+    print(f"{'IS_LEGAL ms':>13}{'SPEEDUP':>9}")
+    for level in levels:
+        moves, pseudo, legal, reference = benchmark_level(level, positions)
+        print(
+            f"{level['name']:<22}{moves:>8}{pseudo * 1000:>11.1f}"
+            f"{legal * 1000:>10.1f}{reference * 1000:>13.1f}"
+            f"{reference / legal:>8.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
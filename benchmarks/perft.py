@@ -0,0 +1,166 @@
+"""
+Perft for every level: counts the leaf nodes of the move tree to a fixed
+depth from seeded positions, with players moving in turn order. Three trees
+are walked, one per move generation stage:
+
+    pseudo   every pseudo move (generate_pseudo_moves)
+    legal    legal moves only (find_legal_moves)
+    attacks  legal tree, counting the attacking moves at the last ply (find_attacks)
+
+Capturing a king ends that line, a player with no moves passes. Node counts
+are compared against benchmarks/perft_baseline.json (any difference fails)
+along with nodes/sec, so engine changes show up as correctness or speed
+regressions.
+
+Usage: python -m benchmarks.perft [depth] [positions per level] [--save]
+"""
+
+from array import array
+from pathlib import Path
+import json
+import sys
+import time
+
+from components.chess import (
+    Colour,
+    Piece,
+    Board,
+    PlayerPieces,
+    generate_pseudo_moves,
+    find_legal_moves,
+    find_attacks,
+    make_move,
+    unmake_move,
+    pass_turn,
+)
+from components.levels import levels
+from benchmarks.positions import generate_position
+
+BASELINE_PATH = Path(__file__).with_name("perft_baseline.json")
+MODES = ("pseudo", "legal", "attacks")
+# Plies of random moves played before each position, per seed
+PLIES_PER_SEED = 8
+# Minimum runs of and time spent on each tree, for stable nodes/sec
+MIN_RUNS = 3
+MIN_SECONDS = 0.3
+# Slower than this fraction of the baseline's nodes/sec gets flagged
+SLOWDOWN = 0.8
+
+
+def perft(
+    board: Board,
+    player_pieces: PlayerPieces,
+    players: list[Colour],
+    ply: int,
+    depth: int,
+    mode: str,
+    buffers: list[tuple[array, array, array]],
+) -> int:
+    colour = players[ply % len(players)]
+    # Each depth has its own move lists, the caller is still looping over theirs
+    pseudo_moves, legal_moves, attacks = buffers[depth]
+
+    moves = generate_pseudo_moves(board, player_pieces, colour, pseudo_moves)
+    if mode != "pseudo":
+        moves = find_legal_moves(board, player_pieces, colour, moves, legal_moves)
+
+    if depth == 1:
+        if mode == "attacks":
+            return len(find_attacks(board, player_pieces, colour, moves, attacks))
+        return len(moves)
+
+    if not moves:
+        pass_turn(board, colour)
+        nodes = perft(board, player_pieces, players, ply + 1, depth - 1, mode, buffers)
+        pass_turn(board, colour)
+        return nodes
+
+    nodes = 0
+    for move in moves:
+        if make_move(board, player_pieces, colour, move) == Piece.KING:
+            nodes += 1
+        else:
+            nodes += perft(
+                board, player_pieces, players, ply + 1, depth - 1, mode, buffers
+            )
+        unmake_move(board, player_pieces, colour)
+    return nodes
+
+
+def run_level(level: dict, depth: int, positions: int) -> dict:
+    buffers = [(array("I"), array("I"), array("I")) for _ in range(depth + 1)]
+    result = {}
+    games = [
+        generate_position(level, seed, seed * PLIES_PER_SEED)
+        for seed in range(positions)
+    ]
+    for mode in MODES:
+        # Best of several runs, and small trees are repeated until the timing
+        # is long enough to trust, so noise doesn't read as a regression
+        runs = []
+        while len(runs) < MIN_RUNS or sum(runs) < MIN_SECONDS:
+            nodes = 0
+            start = time.perf_counter()
+            for board, player_pieces, players in games:
+                nodes += perft(board, player_pieces, players, 0, depth, mode, buffers)
+            runs.append(time.perf_counter() - start)
+        result[mode] = {"nodes": nodes, "nps": round(nodes / min(runs))}
+    return result
+
+
+def main() -> None:
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    depth = int(args[0]) if len(args) > 0 else 4
+    positions = int(args[1]) if len(args) > 1 else 4
+    save = "--save" in sys.argv
+
+    baseline = {}
+    if BASELINE_PATH.exists():
+        baseline = json.loads(BASELINE_PATH.read_text())
+        if (baseline.get("depth"), baseline.get("positions")) != (depth, positions):
+            print("Baseline was run with different settings, not comparing")
+            baseline = {}
+
+    print(f"{'LEVEL':<22}", end="")
+    for mode in MODES:
+        print(f"{mode.upper() + ' NODES':>15}{'NODES/s':>10}{'VS BASE':>9}", end="")
+    print()
+
+    results = {}
+    mismatches = []
+    for level in levels:
+        result = run_level(level, depth, positions)
+        results[level["name"]] = result
+        expected = baseline.get("levels", {}).get(level["name"])
+
+        print(f"{level['name']:<22}", end="")
+        for mode in MODES:
+            nodes = result[mode]["nodes"]
+            nps = result[mode]["nps"]
+            print(f"{nodes:>15}{nps:>10}", end="")
+            if expected is None:
+                print(f"{'':>9}", end="")
+                continue
+            if nodes != expected[mode]["nodes"]:
+                mismatches.append(f"{level['name']} {mode}")
+            ratio = nps / expected[mode]["nps"]
+            flag = "!" if ratio < SLOWDOWN else " "
+            print(f"{ratio:>7.2f}x{flag}", end="")
+        print()
+
+    if save:
+        BASELINE_PATH.write_text(
+            json.dumps(
+                {"depth": depth, "positions": positions, "levels": results},
+                indent=4,
+            )
+            + "\n"
+        )
+        print(f"Saved baseline to {BASELINE_PATH}")
+
+    if mismatches:
+        raise AssertionError(f"Node counts differ from baseline: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+from components.chess import (
+    Colour,
+    Piece,
+    Board,
+    PlayerPieces,
+    KING,
+    generate_pseudo_moves,
+    move_target,
+    play_move,
+    perform_capture,
+    pass_turn,
+)
+from components.boardgeneration import place_pieces_randomly
+from components.gamestate import GameState
+
+# Stand in for the pieces a player would summon
+PLAYER_ARMY = [Piece.QUEEN, Piece.ROOK, Piece.BISHOP, Piece.KNIGHT] + [Piece.PAWN] * 3
+
+
+def generate_state(level: dict, seed: int, plies: int = 0) -> GameState:
+    """
+    Sets up a level with GameState and summons PLAYER_ARMY, then plays `plies`
+    random pseudo moves (skipping king captures) to reach a middle game.
+    """
+
+    state = GameState(level, seed)
+    board = state.board
+    player_pieces = state.player_pieces
+    players = state.active_players
+
+    place_pieces_randomly(
+        board, player_pieces, players[0], state.player_regions, PLAYER_ARMY, state.rng
+    )
+
+    for ply in range(plies):
+        colour = players[ply % len(players)]
+        moves = [
+            move
+            for move in generate_pseudo_moves(board, player_pieces, colour)
+            if board.pieces[move_target(move)] != KING
+        ]
+        if not moves:
+            pass_turn(board, colour)
+            continue
+        move = state.rng.choice(moves)
+        play_move(board, player_pieces, colour, move)
+        perform_capture(board, player_pieces, move)
+
+    state.turn = plies % len(players)
+    state.active_player = players[state.turn]
+    return state
+
+
+def generate_position(
+    level: dict, seed: int, plies: int = 0
+) -> tuple[Board, PlayerPieces, list[Colour]]:
+    """generate_state for benchmarks that only need the board and pieces."""
+
+    state = generate_state(level, seed, plies)
+    return state.board, state.player_pieces, state.active_players
@@ -0,0 +1,55 @@
+"""
+How deep SearchPolicy gets in a fixed budget with and without its
+transposition table, and how the table is used, on positions from every level.
+
+Usage: python -m benchmarks.search [budget ms] [positions per level] [table MB]
+"""
+
+import sys
+import time
+
+from components.ai import SearchPolicy
+from components.levels import levels
+from benchmarks.positions import generate_state
+
+# Small enough that nearly every store overwrites, as if there was no table
+NO_TABLE_MB = 0
+
+
+def benchmark_level(
+    level: dict, budget: float, positions: int, table_mb: float
+) -> tuple[float, float, SearchPolicy]:
+    depth = 0
+    nodes = 0
+    seconds = 0.0
+    policy = SearchPolicy(budget, table_mb=table_mb)
+    for seed in range(positions):
+        state = generate_state(level, seed, seed * 8)
+        start = time.perf_counter()
+        policy(state)
+        seconds += time.perf_counter() - start
+        depth += policy.depth
+        nodes += policy.nodes
+    return depth / positions, nodes / seconds, policy
+
+
+def main() -> None:
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else 50
+    positions = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    table_mb = float(sys.argv[3]) if len(sys.argv) > 3 else 8
+
+    print(f"{'LEVEL':<22}{'NO TABLE':>10}{'DEPTH':>7}{'NODES/s':>9}", end="")
+    print(f"{'HIT RATE':>10}{'STORES':>9}{'OVERWRITES':>12}")
+    for level in levels:
+        plain_depth, _, _ = benchmark_level(level, budget, positions, NO_TABLE_MB)
+        depth, speed, policy = benchmark_level(level, budget, positions, table_mb)
+        table = policy.table
+        print(
+            f"{level['name']:<22}{plain_depth:>10.1f}{depth:>7.1f}"
+            f"{speed:>9.0f}{table.hit_rate:>10.1%}"
+            f"{table.stores:>9}{table.overwrites:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
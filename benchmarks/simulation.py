@@ -0,0 +1,56 @@
+"""
+Monte Carlo outcome estimate for every level with PLAYER_ARMY summoned at the
+front of the player's region, and how the runner scales with worker count.
+
+Usage: python -m benchmarks.simulation [games per level] [workers]
+"""
+
+import os
+import sys
+
+from components.chess import Outcome
+from components.levels import levels
+from components.simulation import create_state, simulate
+from benchmarks.positions import PLAYER_ARMY
+
+
+def main() -> None:
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+
+    print(f"{'LEVEL':<22}{'WIN':>16}{'DRAW':>16}{'LOSE':>16}{'GAMES/s':>10}")
+    for level in levels:
+        state = create_state(level, (), seed=0)
+        x, y, width, height = state.player_regions[state.active_players[0]]
+        # Fill the region from the top row down, the side facing the enemy
+        open_squares = [
+            (x + i % width, y + i // width)
+            for i in range(width * height)
+            if state.can_summon((x + i % width, y + i // width))
+        ]
+        for square, piece in zip(open_squares, PLAYER_ARMY):
+            state.summon(square, piece)
+
+        result = simulate(state, games, workers=workers)
+        print(f"{level['name']:<22}", end="")
+        for outcome in (Outcome.WIN, Outcome.DRAW, Outcome.LOSE):
+            low, high = result.confidence_interval(outcome)
+            print(f"{result.rate(outcome):>6.1%} ±{(high - low) / 2:>6.1%}  ", end="")
+        print(f"{result.games_per_second:>10.0f}")
+
+    print()
+    print(f"{'WORKERS':<10}{'GAMES/s':>10}{'MOVES/s':>12}{'SCALING':>10}")
+    state = create_state(levels[-1], (), seed=0)
+    base = None
+    for count in range(1, workers + 1):
+        result = simulate(state, games, workers=count)
+        base = base or result.games_per_second
+        print(
+            f"{count:<10}{result.games_per_second:>10.0f}"
+            f"{result.moves_per_second:>12.0f}"
+            f"{result.games_per_second / base:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
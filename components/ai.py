@@ -0,0 +1,348 @@
+from typing import Generator, Optional
+from array import array
+import time
+
+from components.chess import (
+    Colour,
+    Piece,
+    SUMMON_COST_MAP,
+    CAPTURE_SHIFT,
+    generate_pseudo_moves,
+    find_legal_moves,
+    make_move,
+    unmake_move,
+    move_target,
+    move_capture,
+    pass_turn,
+    generate_zobrist_keys,
+)
+from components.gamestate import GameState
+from components.transposition import (
+    TranspositionTable,
+    DEFAULT_TABLE_MB,
+    EXACT,
+    LOWER,
+    UPPER,
+)
+
+# Half a frame at 60 FPS, leaving the rest for updating and drawing
+DEFAULT_BUDGET_MS = 8
+# Work done per frame when thinking is spread over several frames
+DEFAULT_SLICE_MS = 4
+MAX_DEPTH = 32
+# Worth more than all the material on any board, less the plies it takes so
+# the search goes for the quickest win and the slowest loss
+MATE_SCORE = 1_000_000
+# Scores past this are wins or losses, stored in the table relative to the
+# node so they stay right when the position comes up at another ply
+MATE_THRESHOLD = MATE_SCORE - 1000
+
+# Scores depend on who the search is for, so each root player hashes apart
+ROOT_KEYS = generate_zobrist_keys(len(Colour), 0x2007)
+
+# Material decides, the distance of the player's pieces to the enemy kings
+# breaks ties so the search closes in instead of shuffling pieces around
+MATERIAL_WEIGHT = 16
+PIECE_VALUES = tuple(SUMMON_COST_MAP[piece] * MATERIAL_WEIGHT for piece in Piece)
+
+
+class SearchPolicy:
+    """
+    Paranoid alpha-beta search. The player to move maximises their material
+    minus everyone else's, and every opponent is assumed to be working
+    together to minimise it. Iterative deepening stops at the time budget and
+    plays the best move of the deepest search that finished.
+    """
+
+    def __init__(
+        self,
+        budget_ms: float = DEFAULT_BUDGET_MS,
+        max_depth: int = MAX_DEPTH,
+        table_mb: float = DEFAULT_TABLE_MB,
+    ) -> None:
+        self.budget_ms = budget_ms
+        self.max_depth = max_depth
+        # Kept between moves, the next search starts from what this one found
+        self.table = TranspositionTable(table_mb)
+
+        # Search statistics of the last move, for tuning
+        self.nodes = 0
+        self.depth = 0
+
+    def __call__(self, state: GameState) -> Optional[int]:
+        return finish_thinking(self.think(state, state.active_player, 0, None))
+
+    def think(
+        self,
+        state: GameState,
+        colour: Colour,
+        available_ms: float = 0,
+        slice_ms: Optional[float] = DEFAULT_SLICE_MS,
+    ) -> Generator[None, Optional[float], Optional[int]]:
+        """
+        Picks colour's move in slices of about slice_ms (None for no slices),
+        yielding between them so the game can draw a frame. send() a number
+        of ms instead of next() to make the slices that long from then on.
+        Searches until available_ms from now, but for at least the budget, and
+        returns the move. Searches a copy of the board, so the game can carry
+        on drawing the real one.
+        """
+
+        self.board = state.board.copy()
+        self.player_pieces = {
+            player: pieces.copy() for player, pieces in state.player_pieces.items()
+        }
+        self.players = state.active_players
+        self.alive = [state.alive_players[player] for player in self.players]
+        self.root = self.players.index(colour)
+        self.root_key = ROOT_KEYS[colour.value]
+        self.table.new_search()
+
+        start = time.perf_counter()
+        self.deadline = start + max(self.budget_ms, available_ms) / 1000
+        self.slice = float("inf") if slice_ms is None else slice_ms / 1000
+        self.slice_end = start + self.slice
+        self.aborted = False
+        self.nodes = 0
+        self.depth = 0
+
+        # One pair of move lists per ply so each node can loop over its own
+        self.buffers = [(array("I"), array("I")) for _ in range(self.max_depth + 1)]
+
+        moves = self.generate_moves(colour, 0)
+        if len(moves) <= 1:
+            return moves[0] if moves else None
+        # Moves that score the same are picked between at random
+        state.rng.shuffle(moves)
+
+        best_move = moves[0]
+        for depth in range(1, self.max_depth + 1):
+            score, move = yield from self.search_root(moves, best_move, depth)
+            if self.aborted:
+                break
+            best_move = move
+            self.depth = depth
+            # A forced win or loss won't change with more depth
+            if abs(score) >= MATE_SCORE - self.max_depth:
+                break
+
+        return best_move
+
+    def hurry(self) -> None:
+        """Cuts the running think() down to at most the budget from now."""
+
+        self.deadline = min(self.deadline, time.perf_counter() + self.budget_ms / 1000)
+
+    def search_root(
+        self, moves: list[int], best_move: int, depth: int
+    ) -> Generator[None, Optional[float], tuple[int, int]]:
+        # Try the best move of the last iteration first, it most likely still is
+        moves = [best_move] + [move for move in moves if move != best_move]
+
+        alpha = -MATE_SCORE - 1
+        beta = MATE_SCORE + 1
+        for move in moves:
+            score = yield from self.search_move(self.root, move, depth, 0, alpha, beta)
+            if self.aborted:
+                break
+            if score > alpha:
+                alpha = score
+                best_move = move
+
+        return alpha, best_move
+
+    def search_move(
+        self, turn: int, move: int, depth: int, ply: int, alpha: int, beta: int
+    ) -> Generator[None, Optional[float], int]:
+        """Returns: The score after the player at turn plays move."""
+
+        colour = self.players[turn]
+        captured = make_move(self.board, self.player_pieces, colour, move)
+
+        if captured == Piece.KING:
+            victim = self.players.index(move_capture(move))
+            if victim == self.root:
+                score = -MATE_SCORE + ply
+            else:
+                self.alive[victim] = False
+                if sum(self.alive) == 1:
+                    score = MATE_SCORE - ply
+                else:
+                    score = yield from self.search(
+                        self.next_turn(turn), depth - 1, ply + 1, alpha, beta
+                    )
+                self.alive[victim] = True
+        else:
+            score = yield from self.search(
+                self.next_turn(turn), depth - 1, ply + 1, alpha, beta
+            )
+
+        unmake_move(self.board, self.player_pieces, colour)
+        return score
+
+    def search(
+        self, turn: int, depth: int, ply: int, alpha: int, beta: int
+    ) -> Generator[None, Optional[float], int]:
+        self.nodes += 1
+        now = time.perf_counter()
+        if now > self.deadline:
+            self.aborted = True
+            return 0
+        if now > self.slice_end:
+            # Out of time for this frame, carry on from here in the next one
+            slice_ms = yield
+            if slice_ms is not None:
+                self.slice = slice_ms / 1000
+            self.slice_end = time.perf_counter() + self.slice
+
+        if depth == 0:
+            return self.evaluate()
+
+        colour = self.players[turn]
+
+        # Dead players pass without using up any depth, like in the game
+        if not self.alive[turn]:
+            pass_turn(self.board, colour)
+            score = yield from self.search(
+                self.next_turn(turn), depth, ply, alpha, beta
+            )
+            pass_turn(self.board, colour)
+            return score
+
+        key = self.board.hash ^ self.root_key
+        hash_move = 0
+        entry = self.table.probe(key)
+        if entry is not None:
+            entry_depth, score, bound, hash_move = entry
+            if entry_depth >= depth:
+                if score > MATE_THRESHOLD:
+                    score -= ply
+                elif score < -MATE_THRESHOLD:
+                    score += ply
+
+                if (
+                    bound == EXACT
+                    or (bound == LOWER and score >= beta)
+                    or (bound == UPPER and score <= alpha)
+                ):
+                    return score
+
+        moves = self.generate_moves(colour, ply, hash_move)
+
+        # Can't make move. Opponents pass for free, so a stuck king doesn't
+        # hide the capture that comes after it. Only the root's passes use up
+        # depth, which stops everyone passing forever
+        if not moves:
+            if turn == self.root:
+                depth -= 1
+            pass_turn(self.board, colour)
+            score = yield from self.search(
+                self.next_turn(turn), depth, ply, alpha, beta
+            )
+            pass_turn(self.board, colour)
+            return score
+
+        maximising = turn == self.root
+        start_alpha = alpha
+        start_beta = beta
+        best_move = moves[0]
+        for move in moves:
+            score = yield from self.search_move(turn, move, depth, ply, alpha, beta)
+            if self.aborted:
+                return 0
+
+            if maximising:
+                if score > alpha:
+                    alpha = score
+                    best_move = move
+            elif score < beta:
+                beta = score
+                best_move = move
+            if alpha >= beta:
+                break
+
+        score = alpha if maximising else beta
+        if alpha >= beta:
+            bound = LOWER if maximising else UPPER
+        elif maximising and alpha == start_alpha:
+            bound = UPPER
+        elif not maximising and beta == start_beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+
+        stored_score = score
+        if score > MATE_THRESHOLD:
+            stored_score += ply
+        elif score < -MATE_THRESHOLD:
+            stored_score -= ply
+        self.table.store(key, depth, stored_score, bound, best_move)
+
+        return score
+
+    def generate_moves(self, colour: Colour, ply: int, hash_move: int = 0) -> list[int]:
+        """
+        Returns: Legal moves, the table's best move first then captures of the
+        most valuable pieces.
+        """
+
+        pseudo_moves, legal_moves = self.buffers[ply]
+        generate_pseudo_moves(self.board, self.player_pieces, colour, pseudo_moves)
+        find_legal_moves(
+            self.board, self.player_pieces, colour, pseudo_moves, legal_moves
+        )
+
+        pieces = self.board.pieces
+        captures = [move for move in legal_moves if move >> CAPTURE_SHIFT]
+        captures.sort(key=lambda move: PIECE_VALUES[pieces[move_target(move)]])
+        captures.reverse()
+        moves = captures + [move for move in legal_moves if not move >> CAPTURE_SHIFT]
+
+        # Check it's really one of the moves in case of a hash collision
+        if hash_move and hash_move in legal_moves:
+            moves.remove(hash_move)
+            moves.insert(0, hash_move)
+        return moves
+
+    def next_turn(self, turn: int) -> int:
+        return (turn + 1) % len(self.players)
+
+    def evaluate(self) -> int:
+        board = self.board
+        pieces = board.pieces
+        score = 0
+        enemy_kings = []
+        for turn, colour in enumerate(self.players):
+            if not self.alive[turn]:
+                continue
+            material = 0
+            for square in self.player_pieces[colour]:
+                material += PIECE_VALUES[pieces[square]]
+            if turn == self.root:
+                score += material
+            else:
+                score -= material
+                enemy_kings.append(self.player_pieces[colour][0])
+
+        xs = board.xs
+        ys = board.ys
+        for square in self.player_pieces[self.players[self.root]]:
+            score -= min(
+                max(abs(xs[square] - xs[king]), abs(ys[square] - ys[king]))
+                for king in enemy_kings
+            )
+        return score
+
+
+def finish_thinking(
+    thinking: Generator[None, Optional[float], Optional[int]],
+) -> Optional[int]:
+    """Runs the rest of a think() without yielding. Returns: Its move."""
+
+    try:
+        # Starts it if it hasn't started, later slices never end
+        thinking.send(None)
+        while True:
+            thinking.send(float("inf"))
+    except StopIteration as stop:
+        return stop.value
@@ -1,15 +1,22 @@
+import math
 import random
 
-from components.chess import Colour, Piece, Board, PlayerPieces
+from components.chess import (
+    Colour,
+    Piece,
+    Board,
+    PieceList,
+    PlayerPieces,
+    set_turn_order,
+)
 
 
-# random.seed(0)  # HACK: For debugging
-
-
-def generate_empty_board(squares: int, width: int, height: int) -> Board:
+def generate_empty_board(
+    squares: int, width: int, height: int, rng: random.Random
+) -> Board:
     start = (width // 2, height // 2)
 
-    board = {}
+    board_squares = []
     open_squares = [start]
     seen = set()
     seen.add(start)
@@ -19,8 +26,8 @@ def generate_empty_board(squares: int, width: int, height: int) -> Board:
         if iterations == squares:
             break
         # Pick random open square
-        square = open_squares.pop(random.randint(0, len(open_squares) - 1))
-        board[square] = None
+        square = open_squares.pop(rng.randint(0, len(open_squares) - 1))
+        board_squares.append(square)
 
         # Check neighbouring cells
         for direction in ((0, 1), (0, -1), (1, 0), (-1, 0)):
@@ -46,17 +53,42 @@ def generate_empty_board(squares: int, width: int, height: int) -> Board:
     if iterations != squares:
         print("Too many squares to fit within bounds!")
 
-    # Sort board squares
-    sorted_board_squares = list(board.items())
-    sorted_board_squares.sort(key=lambda item: item[0][1])
+    # Board keeps its squares in row-major order
+    return Board(width, height, board_squares)
+
+
+def generate_empty_player_pieces(board: Board, players: list[Colour]) -> PlayerPieces:
+    # Players take turns in this order, and the board's hash tracks whose turn it is
+    set_turn_order(board, players)
+    return {colour: PieceList(len(board.pieces)) for colour in players}
 
-    sorted_board = dict(sorted_board_squares)
 
-    return sorted_board
+def generate_player_regions(
+    players: list[Colour], width: int, height: int
+) -> dict[Colour, tuple[int, int, int, int]]:
+    # First player (YOU) gets bottom half of board. Opponents get top half divided equally
+    player_regions = {}
+    player_regions[players[0]] = (
+        0,
+        math.floor(height / 2),
+        width,
+        math.ceil(height / 2),
+    )
+    divided_width = math.floor(width / (len(players) - 1))
+    for i in range(1, len(players)):
+        extra = 0
+        if i == len(players) - 1:
+            extra = width - width // (len(players) - 1) * (len(players) - 1)
 
+        colour = players[i]
+        player_regions[colour] = (
+            divided_width * (i - 1),
+            -0.8,
+            divided_width + extra,
+            math.floor(height / 2) + 0.8,
+        )
 
-def generate_empty_player_pieces(players: list[Colour]) -> PlayerPieces:
-    return {colour: [] for colour in players}
+    return player_regions
 
 
 def place_king_randomly(
@@ -65,6 +97,7 @@ def place_king_randomly(
     player_colour: Colour,
     player_regions: dict[Colour, tuple[int, int, int, int]],
     is_player: bool,
+    rng: random.Random,
 ) -> None:
     region = player_regions[player_colour]
     closest = None
@@ -98,9 +131,9 @@ def place_king_randomly(
             if square[1] == furthest:
                 furthest_squares.append(square)
 
-        selected_square = random.choice(furthest_squares)
-        board[selected_square] = Piece.KING
-        player_pieces[player_colour].append(selected_square)
+        selected_square = rng.choice(furthest_squares)
+        index = board.place(selected_square, Piece.KING, player_colour)
+        player_pieces[player_colour].append(index)
 
     else:
         # place king on any square in closest rank
@@ -109,9 +142,9 @@ def place_king_randomly(
             if square[1] == closest:
                 closest_squares.append(square)
 
-        selected_square = random.choice(closest_squares)
-        board[selected_square] = Piece.KING
-        player_pieces[player_colour].append(selected_square)
+        selected_square = rng.choice(closest_squares)
+        index = board.place(selected_square, Piece.KING, player_colour)
+        player_pieces[player_colour].append(index)
 
 
 def place_pieces_randomly(
@@ -120,6 +153,7 @@ def place_pieces_randomly(
     player_colour: Colour,
     player_regions: dict[Colour, tuple[int, int, int, int]],
     pieces: list[Piece],
+    rng: random.Random,
 ) -> None:
     region = player_regions[player_colour]
     open_squares = []
@@ -136,12 +170,12 @@ def place_pieces_randomly(
 
         open_squares.append(square)
 
-    random.shuffle(open_squares)
+    rng.shuffle(open_squares)
 
     for piece in pieces:
         if not open_squares:
             print("Not enough open squares to place pieces!")
             break
         square = open_squares.pop()
-        board[square] = piece
-        player_pieces[player_colour].append(square)
+        index = board.place(square, piece, player_colour)
+        player_pieces[player_colour].append(index)
@@ -1,6 +1,8 @@
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from enum import Enum, auto
 from dataclasses import dataclass
+from functools import lru_cache
+from array import array
 import random
 
 
@@ -30,6 +32,17 @@ class Piece(Enum):
     KING = auto()
 
 
+# Mana to summon each piece, also what the search thinks a piece is worth
+SUMMON_COST_MAP = {
+    Piece.PAWN: 1,
+    Piece.KNIGHT: 3,
+    Piece.BISHOP: 3,
+    Piece.ROOK: 5,
+    Piece.QUEEN: 9,
+    Piece.KING: 2,
+}
+
+
 @dataclass(frozen=True)
 class Move:
     piece_x: int
@@ -39,8 +52,18 @@ class Move:
     capture: Optional[Colour]
 
 
-Board = dict[tuple[int, int], Optional[Piece]]
-PlayerPieces = dict[Colour, list[tuple[int, int]]]
+# Move generation packs moves into ints: start index in the low bits, then
+# target index, then the captured piece's owner code + 1 (0 if no capture).
+# Move lists are array("I") buffers of these, decode_move() gives a Move
+TARGET_SHIFT = 12
+CAPTURE_SHIFT = 24
+SQUARE_MASK = (1 << TARGET_SHIFT) - 1
+MOVE_MASK = (1 << 28) - 1
+
+# make_move's undo deltas add the captured piece code and its piece list slot
+UNDO_PIECE_SHIFT = 28
+UNDO_PIECE_MASK = 0b111
+UNDO_SLOT_SHIFT = 31
 
 
 KNIGHT_MOVES = ((1, 2), (1, -2), (-1, 2), (-1, -2), (2, 1), (2, -1), (-2, -1), (-2, 1))
@@ -57,17 +80,332 @@ QUEEN_DIRECTIONS = (
     (-1, 1),
 )
 KING_MOVES = ((0, 1), (0, -1), (-1, 0), (1, 0), (1, 1), (1, -1), (-1, -1), (-1, 1))
+# Pairs of opposite directions above that make up a line through a square
+ROOK_LINES = ((0, 1), (2, 3))
+BISHOP_LINES = ((0, 2), (1, 3))
+
+
+PIECES = tuple(Piece)
+COLOURS = tuple(Colour)
+
+# Cell codes for Board.pieces. Piece codes are Piece.value
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = (piece.value for piece in Piece)
+EMPTY = len(Piece)
+OFF_BOARD = EMPTY + 1
+# Cell code for Board.owners. Owner codes are Colour.value
+NO_OWNER = 0xFF
+
+# Knights reach two squares, so two rings of OFF_BOARD cells surround every
+# board and no probe can ever index outside the arrays
+PADDING = 2
+
+# One Zobrist key per (cell, owner, piece) and one per side to move. Fixed
+# seeds so a position hashes the same in every run and every process
+ZOBRIST_BITS = 64
+ZOBRIST_PIECE_SEED = 0x5EED
+ZOBRIST_SIDE_SEED = 0x51DE
+CELL_KEYS = len(Colour) * len(Piece)
+
+
+@lru_cache
+def generate_zobrist_keys(count: int, seed: int) -> tuple[int, ...]:
+    rng = random.Random(seed)
+    return tuple(rng.getrandbits(ZOBRIST_BITS) for _ in range(count))
+
+
+SIDE_KEYS = generate_zobrist_keys(len(Colour), ZOBRIST_SIDE_SEED)
+
+
+class Board:
+    """
+    Flat padded mailbox board. Every cell holds a piece code in `pieces` and an
+    owner code in `owners`. Holes and the padding ring are OFF_BOARD so move
+    generation only needs a single array read per probe.
+
+    Squares are addressed by flat index. The read only mapping methods keep
+    the old dict[tuple[int, int], Optional[Piece]] interface for callers that
+    think in (x, y) squares. Pieces are put down with place().
+    """
+
+    def __init__(
+        self, width: int, height: int, squares: Iterable[tuple[int, int]]
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.stride = width + 2 * PADDING
+        size = self.stride * (height + 2 * PADDING)
+
+        if size > SQUARE_MASK + 1:
+            raise ValueError(f"{width}x{height} board is too big to pack moves")
+
+        self.pieces = bytearray([OFF_BOARD]) * size
+        self.owners = bytearray([NO_OWNER]) * size
+        for x, y in squares:
+            self.pieces[self.index(x, y)] = EMPTY
+
+        # On board indices in row-major order (also the order squares render in)
+        self.squares = [i for i in range(size) if self.pieces[i] != OFF_BOARD]
+        self.xs = [i % self.stride - PADDING for i in range(size)]
+        self.ys = [i // self.stride - PADDING for i in range(size)]
+
+        # Position hash, kept up to date by every change to the board
+        self.zobrist = generate_zobrist_keys(size * CELL_KEYS, ZOBRIST_PIECE_SEED)
+        self.hash = 0
+        # Side to move key changes per player, see set_turn_order
+        self.turn_keys: dict[Colour, int] = {}
+
+        # Scratch move lists reused by pick_random_move every turn
+        self.move_buffers = tuple(array("I") for _ in range(4))
+        # Deltas pushed by make_move and popped by unmake_move
+        self.history: list[int] = []
+
+        # Squares can't be added or removed after this, so compile the shape
+        self.geometry = BoardGeometry(self)
+
+    def copy(self) -> "Board":
+        """Copies the position. The tables that only depend on shape are shared."""
+        board = object.__new__(Board)
+        board.__dict__.update(self.__dict__)
+        board.pieces = self.pieces[:]
+        board.owners = self.owners[:]
+        board.move_buffers = tuple(array("I") for _ in range(4))
+        board.history = []
+        return board
+
+    def index(self, x: int, y: int) -> int:
+        return (y + PADDING) * self.stride + x + PADDING
+
+    def square(self, index: int) -> tuple[int, int]:
+        return (self.xs[index], self.ys[index])
+
+    def key(self, index: int, owner: int, piece: int) -> int:
+        """Returns: The Zobrist key of a piece code owned by an owner code."""
+        return self.zobrist[index * CELL_KEYS + owner * len(Piece) + piece]
+
+    def place(self, square: tuple[int, int], piece: Piece, colour: Colour) -> int:
+        """Puts a piece owned by colour on an empty square. Returns its index."""
+        index = self._checked_index(square)
+        self.pieces[index] = piece.value
+        self.owners[index] = colour.value
+        self.hash ^= self.key(index, colour.value, piece.value)
+        return index
+
+    def _checked_index(self, square: tuple[int, int]) -> int:
+        if square not in self:
+            raise KeyError(square)
+        return self.index(*square)
+
+    def __contains__(self, square: tuple[int, int]) -> bool:
+        x, y = square
+        return (
+            0 <= x < self.width
+            and 0 <= y < self.height
+            and self.pieces[self.index(x, y)] != OFF_BOARD
+        )
+
+    def __getitem__(self, square: tuple[int, int]) -> Optional[Piece]:
+        code = self.pieces[self._checked_index(square)]
+        return None if code == EMPTY else PIECES[code]
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        for index in self.squares:
+            yield (self.xs[index], self.ys[index])
+
+    def __len__(self) -> int:
+        return len(self.squares)
+
+    def items(self) -> Iterator[tuple[tuple[int, int], Optional[Piece]]]:
+        pieces = self.pieces
+        for index in self.squares:
+            code = pieces[index]
+            yield (
+                (self.xs[index], self.ys[index]),
+                None if code == EMPTY else PIECES[code],
+            )
+
+
+class BoardGeometry:
+    """
+    Per square move tables for one board shape, already clipped to its holes
+    and edges. Every table is indexed by flat board index and off board cells
+    hold empty entries.
+
+    Rays run outwards from the square and stop before the first square that
+    isn't on the board. Pawn tables are keyed by pawn direction (-1 or 1).
+    """
+
+    def __init__(self, board: Board) -> None:
+        self.stride = board.stride
+        on_board = [code != OFF_BOARD for code in board.pieces]
+        cells = range(len(on_board))
+
+        def targets(square: int, moves: tuple[tuple[int, int], ...]) -> tuple[int, ...]:
+            if not on_board[square]:
+                return ()
+            offsets = (self.offset(dx, dy) for dx, dy in moves)
+            return tuple(square + o for o in offsets if on_board[square + o])
+
+        def rays(
+            square: int, directions: tuple[tuple[int, int], ...]
+        ) -> tuple[tuple[int, ...], ...]:
+            if not on_board[square]:
+                return ()
+            result = []
+            for dx, dy in directions:
+                offset = self.offset(dx, dy)
+                ray = []
+                target = square + offset
+                while on_board[target]:
+                    ray.append(target)
+                    target += offset
+                result.append(tuple(ray))
+            return tuple(result)
+
+        self.knight_targets = [targets(i, KNIGHT_MOVES) for i in cells]
+        self.king_targets = [targets(i, KING_MOVES) for i in cells]
+        self.rook_rays = [rays(i, ROOK_DIRECTIONS) for i in cells]
+        self.bishop_rays = [rays(i, BISHOP_DIRECTIONS) for i in cells]
+        self.queen_rays = [
+            rook + bishop for rook, bishop in zip(self.rook_rays, self.bishop_rays)
+        ]
+        self.slider_rays = {
+            BISHOP: self.bishop_rays,
+            ROOK: self.rook_rays,
+            QUEEN: self.queen_rays,
+        }
+
+        # Push target is None when the square ahead isn't on the board
+        self.pawn_pushes: dict[int, list[Optional[int]]] = {}
+        self.pawn_captures: dict[int, list[tuple[int, ...]]] = {}
+        for d in (-1, 1):
+            pushes = [targets(i, ((0, d),)) for i in cells]
+            self.pawn_pushes[d] = [push[0] if push else None for push in pushes]
+            self.pawn_captures[d] = [targets(i, ((1, d), (-1, d))) for i in cells]
+
+    def offset(self, dx: int, dy: int) -> int:
+        return dx + dy * self.stride
+
+
+class PieceList:
+    """
+    The squares one player's pieces are on. `slots` maps a board index back to
+    its position in `squares`, so moving or removing a piece is O(1).
+
+    Slot 0 is the king. Removing a piece swaps the last piece into its slot,
+    which never disturbs the king unless the king itself is captured.
+    """
+
+    __slots__ = ("squares", "slots")
+
+    def __init__(self, size: int) -> None:
+        self.squares: list[int] = []
+        self.slots = array("h", [-1]) * size
+
+    def copy(self) -> "PieceList":
+        pieces = object.__new__(PieceList)
+        pieces.squares = self.squares[:]
+        pieces.slots = self.slots[:]
+        return pieces
+
+    def append(self, square: int) -> None:
+        self.slots[square] = len(self.squares)
+        self.squares.append(square)
+
+    def move(self, start: int, target: int) -> None:
+        slot = self.slots[start]
+        self.squares[slot] = target
+        self.slots[target] = slot
+        self.slots[start] = -1
+
+    def remove(self, square: int) -> int:
+        """Returns: The slot the piece was in, for restore()."""
+        slot = self.slots[square]
+        last = self.squares.pop()
+        if last != square:
+            self.squares[slot] = last
+            self.slots[last] = slot
+        self.slots[square] = -1
+        return slot
+
+    def restore(self, square: int, slot: int) -> None:
+        """Undoes remove(), putting every piece back in its old slot."""
+        if slot < len(self.squares):
+            displaced = self.squares[slot]
+            self.slots[displaced] = len(self.squares)
+            self.squares.append(displaced)
+            self.squares[slot] = square
+        else:
+            self.squares.append(square)
+        self.slots[square] = slot
+
+    def __getitem__(self, slot: int) -> int:
+        return self.squares[slot]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.squares)
+
+    def __len__(self) -> int:
+        return len(self.squares)
+
+    def __contains__(self, square: int) -> bool:
+        return self.slots[square] != -1
+
+
+PlayerPieces = dict[Colour, PieceList]
+
+
+def encode_move(start: int, target: int, capture: Optional[Colour] = None) -> int:
+    move = start | target << TARGET_SHIFT
+    if capture is not None:
+        move |= (capture.value + 1) << CAPTURE_SHIFT
+    return move
+
+
+def move_start(move: int) -> int:
+    return move & SQUARE_MASK
+
+
+def move_target(move: int) -> int:
+    return move >> TARGET_SHIFT & SQUARE_MASK
+
+
+def move_capture(move: int) -> Optional[Colour]:
+    owner = move >> CAPTURE_SHIFT
+    return COLOURS[owner - 1] if owner else None
+
+
+def decode_move(board: Board, move: int) -> Move:
+    start = move_start(move)
+    target = move_target(move)
+    return Move(
+        board.xs[start],
+        board.ys[start],
+        board.xs[target],
+        board.ys[target],
+        move_capture(move),
+    )
+
+
+def clear_buffer(moves: Optional[array]) -> array:
+    if moves is None:
+        return array("I")
+    del moves[:]
+    return moves
 
 
 def generate_pseudo_moves(
-    board: Board, player_pieces: PlayerPieces, player_colour: Colour
-) -> list[Move]:
-    moves = []
+    board: Board,
+    player_pieces: PlayerPieces,
+    player_colour: Colour,
+    moves: Optional[array] = None,
+) -> array:
+    moves = clear_buffer(moves)
 
+    pieces = board.pieces
     for piece_square in player_pieces[player_colour]:
-        piece = board[piece_square]
-        moves += generate_piece_moves(
-            board, player_pieces, player_colour, piece, *piece_square
+        piece = PIECES[pieces[piece_square]]
+        generate_piece_moves(
+            board, player_pieces, player_colour, piece, piece_square, moves
         )
 
     return moves
@@ -77,30 +415,122 @@ def find_legal_moves(
     board: Board,
     player_pieces: PlayerPieces,
     player_colour: Colour,
-    pseudo_moves: list[Move],
-) -> list[Move]:
-    legal_moves = []
+    pseudo_moves: array,
+    legal_moves: Optional[array] = None,
+) -> array:
+    legal_moves = clear_buffer(legal_moves)
+    checks, pins = find_check_constraints(board, player_pieces, player_colour)
+
+    # Nothing attacks or pins our king so every move is legal
+    if checks is None and not pins:
+        legal_moves.extend(pseudo_moves)
+        return legal_moves
 
     for move in pseudo_moves:
-        if is_legal(board, player_pieces, player_colour, move):
-            legal_moves.append(move)
+        target = move >> TARGET_SHIFT & SQUARE_MASK
+        # Must capture or block every piece giving check
+        if checks is not None and target not in checks:
+            continue
+        # Pinned pieces must stay between the king and the pinning piece
+        pin = pins.get(move & SQUARE_MASK)
+        if pin is not None and target not in pin:
+            continue
+        legal_moves.append(move)
 
     return legal_moves
 
 
+def find_check_constraints(
+    board: Board, player_pieces: PlayerPieces, player_colour: Colour
+) -> tuple[Optional[set[int]], dict[int, set[int]]]:
+    """
+    Looks outwards from the player's king along knight, pawn and slider lines.
+    Kings never move, so a move is legal exactly when its target is in the
+    check set (if any) and a pinned piece's target is in its pin set.
+
+    Returns: (squares that resolve every check or None when not in check,
+    pinned piece square -> squares it may move to)
+    """
+
+    checks = None
+    pins = {}
+
+    if not player_pieces[player_colour]:
+        return checks, pins
+
+    king = player_pieces[player_colour][0]
+    pieces = board.pieces
+    owners = board.owners
+    geometry = board.geometry
+    colour = player_colour.value
+    first_colour = next(iter(player_pieces)).value
+
+    def add_check(squares: set[int]) -> None:
+        nonlocal checks
+        checks = squares if checks is None else checks & squares
+
+    for square in geometry.knight_targets[king]:
+        if pieces[square] == KNIGHT and owners[square] != colour:
+            add_check({square})
+
+    # First player's pawns move up the board (-1) and everyone else's move down
+    for direction in (-1, 1):
+        for square in geometry.pawn_captures[-direction][king]:
+            owner = owners[square]
+            if (
+                pieces[square] == PAWN
+                and owner != colour
+                and (owner == first_colour) == (direction == -1)
+            ):
+                add_check({square})
+
+    for rays, slider in (
+        (geometry.rook_rays[king], ROOK),
+        (geometry.bishop_rays[king], BISHOP),
+    ):
+        for ray in rays:
+            blocker = None
+            for i, square in enumerate(ray):
+                piece = pieces[square]
+                if piece == EMPTY:
+                    continue
+
+                if owners[square] == colour:
+                    # Our first piece on the ray might be pinned, a second shields it
+                    if blocker is not None:
+                        break
+                    blocker = square
+                    continue
+
+                if piece == slider or piece == QUEEN:
+                    line = set(ray[: i + 1])
+                    if blocker is None:
+                        add_check(line)
+                    else:
+                        pins[blocker] = line
+                break
+
+    return checks, pins
+
+
 def is_legal(
     board: Board,
     player_pieces: PlayerPieces,
     player_colour: Colour,
-    move: Move,
+    move: int,
 ) -> bool:
+    """
+    Plays the move and searches every opponent reply for a king capture.
+    find_legal_moves gets the same answer from find_check_constraints, this
+    is kept as the slow reference to compare against.
+    """
+
     legal = True
 
     # Play move on board
-    target_piece = play_move(board, player_pieces, player_colour, move)
-    capture_index = perform_capture(player_pieces, move)
+    make_move(board, player_pieces, player_colour, move)
 
-    king_x, king_y = player_pieces[player_colour][0]
+    king = player_pieces[player_colour][0]
 
     # Go through each piece belonging to opponents
     for colour, piece_positions in player_pieces.items():
@@ -109,15 +539,16 @@ def is_legal(
 
         for piece_position in piece_positions:
             # Find if any of that piece's possible captures is our king
-            piece = board[piece_position]
-            moves = generate_piece_moves(
-                board, player_pieces, colour, piece, *piece_position
+            piece = PIECES[board.pieces[piece_position]]
+            moves = array("I")
+            generate_piece_moves(
+                board, player_pieces, colour, piece, piece_position, moves
             )
             captures = find_captures(moves)
 
             # If piece can capture king, player is in check and move is illegal
             for capture in captures:
-                if capture.target_x == king_x and capture.target_y == king_y:
+                if move_target(capture) == king:
                     legal = False
                     break
 
@@ -128,8 +559,7 @@ def is_legal(
             break
 
     # Unplay move on board
-    undo_move(board, player_pieces, player_colour, move, target_piece)
-    undo_capture(player_pieces, move, capture_index)
+    unmake_move(board, player_pieces, player_colour)
 
     return legal
 
@@ -139,203 +569,276 @@ def generate_piece_moves(
     player_pieces: PlayerPieces,
     player_colour: Colour,
     piece: Piece,
-    x: int,
-    y: int,
-) -> list[Move]:
+    square: int,
+    moves: array,
+) -> None:
+    geometry = board.geometry
     match (piece):
         case Piece.PAWN:
-            d = -1 if player_colour == list(player_pieces.keys())[0] else 1
-            return get_pawn_moves(board, player_pieces, player_colour, x, y, d)
+            d = -1 if player_colour == next(iter(player_pieces)) else 1
+            get_pawn_moves(board, player_colour, square, d, moves)
 
         case Piece.KNIGHT:
-            return get_set_moves(
-                board, player_pieces, player_colour, x, y, KNIGHT_MOVES
+            get_set_moves(
+                board, player_colour, square, geometry.knight_targets[square], moves
             )
 
         case Piece.BISHOP:
-            return get_sliding_moves(
-                board, player_pieces, player_colour, x, y, BISHOP_DIRECTIONS
+            get_sliding_moves(
+                board, player_colour, square, geometry.bishop_rays[square], moves
             )
 
         case Piece.ROOK:
-            return get_sliding_moves(
-                board, player_pieces, player_colour, x, y, ROOK_DIRECTIONS
+            get_sliding_moves(
+                board, player_colour, square, geometry.rook_rays[square], moves
             )
 
         case Piece.QUEEN:
-            return get_sliding_moves(
-                board, player_pieces, player_colour, x, y, QUEEN_DIRECTIONS
+            get_sliding_moves(
+                board, player_colour, square, geometry.queen_rays[square], moves
             )
 
         case Piece.KING:
-            return []
-            return get_set_moves(board, player_pieces, player_colour, x, y, KING_MOVES)
-
-
-def find_piece_colour(player_pieces: PlayerPieces, x: int, y: int) -> Optional[Colour]:
-    for colour, squares in player_pieces.items():
-        # Skip if player piece doesn't belong to them
-        if (x, y) not in squares:
-            continue
+            return
+            get_set_moves(
+                board, player_colour, square, geometry.king_targets[square], moves
+            )
 
-        # Found which player the piece belongs to
-        return colour
 
-    return None
+def find_piece_colour(board: Board, square: int) -> Optional[Colour]:
+    # Owner cells are kept in step with the piece lists by Board.place,
+    # play_move and undo_move, so this is a single array read
+    owner = board.owners[square]
+    return None if owner == NO_OWNER else COLOURS[owner]
 
 
 def get_pawn_moves(
     board: Board,
-    player_pieces: PlayerPieces,
     player_colour: Colour,
-    x: int,
-    y: int,
+    square: int,
     direction: int,
-) -> list[Move]:
-    moves = []
+    moves: array,
+) -> None:
+    pieces = board.pieces
+    owners = board.owners
 
-    new_x = x
-    new_y = y + direction
+    target = board.geometry.pawn_pushes[direction][square]
     # If square inside board and empty
-    if (new_x, new_y) in board and board[(new_x, new_y)] is None:
-        moves.append(Move(x, y, new_x, new_y, None))
+    if target is not None and pieces[target] == EMPTY:
+        moves.append(square | target << TARGET_SHIFT)
     # Captures
-    new_x = x + 1
-    if (new_x, new_y) in board:
-        piece_colour = find_piece_colour(player_pieces, new_x, new_y)
-        if piece_colour is not None and piece_colour != player_colour:
-            moves.append(Move(x, y, new_x, new_y, piece_colour))
-
-    new_x = x - 1
-    if (new_x, new_y) in board:
-        piece_colour = find_piece_colour(player_pieces, new_x, new_y)
-        if piece_colour is not None and piece_colour != player_colour:
-            moves.append(Move(x, y, new_x, new_y, piece_colour))
-
-    return moves
+    for target in board.geometry.pawn_captures[direction][square]:
+        owner = owners[target]
+        if owner != NO_OWNER and owner != player_colour.value:
+            moves.append(square | target << TARGET_SHIFT | (owner + 1) << CAPTURE_SHIFT)
 
 
 def get_set_moves(
     board: Board,
-    player_pieces: PlayerPieces,
     player_colour: Colour,
-    x: int,
-    y: int,
-    set_moves: tuple[tuple[int, int]],
-) -> list[Move]:
-    moves = []
-
-    for set_move in set_moves:
-        new_x = x + set_move[0]
-        new_y = y + set_move[1]
-
-        # Skip if square is not on board
-        if (new_x, new_y) not in board:
-            continue
-
-        piece = board[(new_x, new_y)]
+    square: int,
+    targets: tuple[int, ...],
+    moves: array,
+) -> None:
+    pieces = board.pieces
+    owners = board.owners
+    colour = player_colour.value
 
+    for target in targets:
         # Add as move
-        if piece is None:
-            moves.append(Move(x, y, new_x, new_y, None))
+        if pieces[target] == EMPTY:
+            moves.append(square | target << TARGET_SHIFT)
 
         # Find if valid capture (i.e not one of your team's pieces)
-        else:
-            piece_colour = find_piece_colour(player_pieces, new_x, new_y)
-            if piece_colour != player_colour:
-                moves.append(Move(x, y, new_x, new_y, piece_colour))
-
-    return moves
+        elif owners[target] != colour:
+            moves.append(
+                square | target << TARGET_SHIFT | (owners[target] + 1) << CAPTURE_SHIFT
+            )
 
 
 def get_sliding_moves(
     board: Board,
-    player_pieces: PlayerPieces,
     player_colour: Colour,
-    x: int,
-    y: int,
-    directions: tuple[tuple[int, int]],
-) -> list[Move]:
-    moves = []
-
-    for direction in directions:
-        new_x = x + direction[0]
-        new_y = y + direction[1]
-
-        # Keep moving in direction until not on board or ontop of piece
-        while (new_x, new_y) in board and board[(new_x, new_y)] is None:
-            moves.append(Move(x, y, new_x, new_y, None))
-            new_x += direction[0]
-            new_y += direction[1]
-
-        # Find if can capture piece
-        if (new_x, new_y) in board:
-            piece_colour = find_piece_colour(player_pieces, new_x, new_y)
-            if piece_colour != player_colour:
-                moves.append(Move(x, y, new_x, new_y, piece_colour))
-
-    return moves
+    square: int,
+    rays: tuple[tuple[int, ...], ...],
+    moves: array,
+) -> None:
+    pieces = board.pieces
+    owners = board.owners
+    colour = player_colour.value
+
+    for ray in rays:
+        # Keep moving along ray until ontop of piece
+        for target in ray:
+            if pieces[target] == EMPTY:
+                moves.append(square | target << TARGET_SHIFT)
+                continue
+
+            # Find if can capture piece
+            if owners[target] != colour:
+                moves.append(
+                    square
+                    | target << TARGET_SHIFT
+                    | (owners[target] + 1) << CAPTURE_SHIFT
+                )
+            break
 
 
 def play_move(
-    board: Board, player_pieces: PlayerPieces, player_colour: Colour, move: Move
+    board: Board, player_pieces: PlayerPieces, player_colour: Colour, move: int
 ) -> Optional[Piece]:
-    target_piece = board[(move.target_x, move.target_y)]
-    board[(move.target_x, move.target_y)] = board[(move.piece_x, move.piece_y)]
-    board[(move.piece_x, move.piece_y)] = None
+    start = move & SQUARE_MASK
+    target = move >> TARGET_SHIFT & SQUARE_MASK
+    pieces = board.pieces
+    owners = board.owners
+    piece = pieces[start]
+    owner = owners[start]
 
-    i = player_pieces[player_colour].index((move.piece_x, move.piece_y))
-    player_pieces[player_colour][i] = (move.target_x, move.target_y)
+    target_piece = pieces[target]
+    position_hash = board.hash ^ board.turn_keys[player_colour]
+    position_hash ^= board.key(start, owner, piece) ^ board.key(target, owner, piece)
+    if target_piece != EMPTY:
+        position_hash ^= board.key(target, owners[target], target_piece)
+    board.hash = position_hash
 
-    return target_piece
+    pieces[target] = piece
+    pieces[start] = EMPTY
+    owners[target] = owner
+    owners[start] = NO_OWNER
+
+    player_pieces[player_colour].move(start, target)
+
+    return None if target_piece == EMPTY else PIECES[target_piece]
 
 
 def undo_move(
     board: Board,
     player_pieces: PlayerPieces,
     player_colour: Colour,
-    move: Move,
+    move: int,
     target_piece: Optional[Piece],
 ) -> None:
-    board[(move.piece_x, move.piece_y)] = board[(move.target_x, move.target_y)]
-    board[(move.target_x, move.target_y)] = target_piece
+    start = move & SQUARE_MASK
+    target = move >> TARGET_SHIFT & SQUARE_MASK
+    pieces = board.pieces
+    owners = board.owners
+    piece = pieces[target]
+    owner = owners[target]
 
-    i = player_pieces[player_colour].index((move.target_x, move.target_y))
-    player_pieces[player_colour][i] = (move.piece_x, move.piece_y)
+    pieces[start] = piece
+    pieces[target] = EMPTY if target_piece is None else target_piece.value
+    owners[start] = owner
+    owners[target] = (move >> CAPTURE_SHIFT) - 1 if move >> CAPTURE_SHIFT else NO_OWNER
 
+    position_hash = board.hash ^ board.turn_keys[player_colour]
+    position_hash ^= board.key(start, owner, piece) ^ board.key(target, owner, piece)
+    if target_piece is not None:
+        position_hash ^= board.key(target, owners[target], pieces[target])
+    board.hash = position_hash
 
-def perform_capture(player_pieces: PlayerPieces, move: Move) -> Optional[int]:
-    if move.capture is not None:
-        index = player_pieces[move.capture].index((move.target_x, move.target_y))
-        player_pieces[move.capture].pop(index)
-        return index
+    player_pieces[player_colour].move(target, start)
+
+
+def pass_turn(board: Board, player_colour: Colour) -> None:
+    """Hands the move to the next player when player_colour can't move."""
+    board.hash ^= board.turn_keys[player_colour]
+
+
+def set_turn_order(board: Board, players: Iterable[Colour]) -> None:
+    """Makes the first player the side to move and players take turns in order."""
+    players = list(players)
+    for i, colour in enumerate(players):
+        next_colour = players[(i + 1) % len(players)]
+        board.turn_keys[colour] = SIDE_KEYS[colour.value] ^ SIDE_KEYS[next_colour.value]
+    board.hash ^= SIDE_KEYS[players[0].value]
+
+
+def compute_hash(board: Board, side_to_move: Colour) -> int:
+    """Returns: The position hash built from scratch, for checking board.hash."""
+    position_hash = SIDE_KEYS[side_to_move.value]
+    for index in board.squares:
+        if board.owners[index] != NO_OWNER:
+            position_hash ^= board.key(index, board.owners[index], board.pieces[index])
+    return position_hash
 
 
-def undo_capture(player_pieces: PlayerPieces, move: Move, index: Optional[int]) -> None:
-    # King will never be captured when player is alive so don't need to worry about order messing up then
-    if move.capture is not None:
-        player_pieces[move.capture].insert(index, (move.target_x, move.target_y))
+def perform_capture(
+    board: Board, player_pieces: PlayerPieces, move: int
+) -> Optional[int]:
+    capture = move_capture(move)
+    if capture is not None:
+        return player_pieces[capture].remove(move_target(move))
+
+
+def undo_capture(
+    board: Board, player_pieces: PlayerPieces, move: int, index: Optional[int]
+) -> None:
+    # Puts the piece back in its old slot so the king is still at slot 0
+    capture = move_capture(move)
+    if capture is not None:
+        player_pieces[capture].restore(move_target(move), index)
+
+
+def make_move(
+    board: Board, player_pieces: PlayerPieces, player_colour: Colour, move: int
+) -> Optional[Piece]:
+    """
+    play_move and perform_capture in one, recording what unmake_move needs as
+    a single int on board.history.
+
+    Returns: The captured piece.
+    """
+
+    target_piece = play_move(board, player_pieces, player_colour, move)
+    slot = perform_capture(board, player_pieces, move)
+
+    delta = move
+    if target_piece is not None:
+        delta |= target_piece.value << UNDO_PIECE_SHIFT | slot << UNDO_SLOT_SHIFT
+    board.history.append(delta)
+
+    return target_piece
+
+
+def unmake_move(
+    board: Board, player_pieces: PlayerPieces, player_colour: Colour
+) -> None:
+    """Takes back the last make_move, which player_colour must have played."""
 
+    delta = board.history.pop()
+    move = delta & MOVE_MASK
+    target_piece = None
+    if move >> CAPTURE_SHIFT:
+        target_piece = PIECES[delta >> UNDO_PIECE_SHIFT & UNDO_PIECE_MASK]
 
-def find_captures(moves: list[Move]) -> list[Move]:
-    captures = []
+    undo_move(board, player_pieces, player_colour, move, target_piece)
+    undo_capture(board, player_pieces, move, delta >> UNDO_SLOT_SHIFT)
+
+
+def find_captures(moves: array, captures: Optional[array] = None) -> array:
+    captures = clear_buffer(captures)
     for move in moves:
-        if move.capture:
+        if move >> CAPTURE_SHIFT:
             captures.append(move)
     return captures
 
 
 def is_attack(
-    board: Board, player_pieces: PlayerPieces, player_colour: Colour, move: Move
-) -> Optional[list[Move]]:
-    """Returns: The capturing move(s) the attack threatens."""
+    board: Board, player_pieces: PlayerPieces, player_colour: Colour, move: int
+) -> Optional[int]:
+    """
+    Returns: The capturing move(s) the attack threatens.
+
+    Regenerates every one of the player's moves, find_attacks gets the same
+    answer incrementally and this is kept as the reference for it.
+    """
 
     target_piece = play_move(board, player_pieces, player_colour, move)
     pseudo_moves = generate_pseudo_moves(board, player_pieces, player_colour)
     threatening_captures = None
     for pseudo_move in pseudo_moves:
         # If there is a valid capture on the next move, then this move is an attack.
-        if pseudo_move.capture:
+        if pseudo_move >> CAPTURE_SHIFT:
             threatening_captures = pseudo_move
             break
     undo_move(board, player_pieces, player_colour, move, target_piece)
@@ -344,31 +847,213 @@ def is_attack(
 
 
 def find_attacks(
-    board: Board, player_pieces: PlayerPieces, player_colour: Colour, moves: list[Move]
-) -> list[Move]:
-    attacks = []
+    board: Board,
+    player_pieces: PlayerPieces,
+    player_colour: Colour,
+    moves: array,
+    attacks: Optional[array] = None,
+) -> array:
+    """
+    Finds the moves after which the player has a capture available. Only
+    looks at what a move changes: captures it blocks or removes, the moved
+    piece's new captures and slider lines it uncovers.
+    """
+
+    attacks = clear_buffer(attacks)
+    pieces = board.pieces
+    owners = board.owners
+    colour = player_colour.value
+    capture_lines = find_capture_lines(board, player_pieces, player_colour)
+
+    # Moves of the same piece uncover the same lines
+    uncovered_lines = {}
+
     for move in moves:
-        if is_attack(board, player_pieces, player_colour, move):
-            attacks.append(move)
+        start = move & SQUARE_MASK
+        target = move >> TARGET_SHIFT & SQUARE_MASK
+
+        # A capture we already had survives if this move doesn't make it, move
+        # its piece or land in its path
+        for capture_start, capture_target, path in capture_lines:
+            if (
+                capture_start != start
+                and capture_target != target
+                and target not in path
+            ):
+                attacks.append(move)
+                break
+        else:
+            if start not in uncovered_lines:
+                uncovered_lines[start] = find_uncovered_lines(
+                    board, player_colour, start
+                )
+            # Moving out of the way lets a slider through, unless we land in
+            # its path or take the piece it would capture
+            if any(target not in path for path in uncovered_lines[start]):
+                attacks.append(move)
+                continue
+
+            # Play move on board
+            piece = pieces[start]
+            target_piece = pieces[target]
+            target_owner = owners[target]
+            pieces[target] = piece
+            owners[target] = colour
+            pieces[start] = EMPTY
+            owners[start] = NO_OWNER
+
+            if can_capture(board, player_pieces, player_colour, piece, target):
+                attacks.append(move)
+
+            # Unplay move on board
+            pieces[start] = piece
+            owners[start] = colour
+            pieces[target] = target_piece
+            owners[target] = target_owner
+
     return attacks
 
 
-def pick_random_move(
+def find_capture_lines(
     board: Board, player_pieces: PlayerPieces, player_colour: Colour
-) -> Optional[Move]:
-    pseudo_moves = generate_pseudo_moves(board, player_pieces, player_colour)
-    possible_moves = pseudo_moves
-    # possible_moves = find_legal_moves(board, player_pieces, player_colour, pseudo_moves)
+) -> list[tuple[int, int, tuple[int, ...]]]:
+    """Returns: (piece square, captured square, squares in between) per capture."""
+
+    capture_lines = []
+    pieces = board.pieces
+    owners = board.owners
+    geometry = board.geometry
+    colour = player_colour.value
+
+    for square in player_pieces[player_colour]:
+        piece = pieces[square]
+        if piece == PAWN:
+            d = -1 if player_colour == next(iter(player_pieces)) else 1
+            for target in geometry.pawn_captures[d][square]:
+                if owners[target] != NO_OWNER and owners[target] != colour:
+                    capture_lines.append((square, target, ()))
+
+        elif piece == KNIGHT:
+            for target in geometry.knight_targets[square]:
+                if pieces[target] != EMPTY and owners[target] != colour:
+                    capture_lines.append((square, target, ()))
+
+        elif piece != KING:
+            for ray in geometry.slider_rays[piece][square]:
+                for i, target in enumerate(ray):
+                    if pieces[target] == EMPTY:
+                        continue
+                    if owners[target] != colour:
+                        capture_lines.append((square, target, ray[:i]))
+                    break
+
+    return capture_lines
+
+
+def can_capture(
+    board: Board,
+    player_pieces: PlayerPieces,
+    player_colour: Colour,
+    piece: int,
+    square: int,
+) -> bool:
+    """Returns: If the piece code on square has a capture available."""
+
+    pieces = board.pieces
+    owners = board.owners
+    geometry = board.geometry
+    colour = player_colour.value
+
+    if piece == PAWN:
+        d = -1 if player_colour == next(iter(player_pieces)) else 1
+        for target in geometry.pawn_captures[d][square]:
+            if owners[target] != NO_OWNER and owners[target] != colour:
+                return True
+
+    elif piece == KNIGHT:
+        for target in geometry.knight_targets[square]:
+            if pieces[target] != EMPTY and owners[target] != colour:
+                return True
+
+    elif piece != KING:
+        for ray in geometry.slider_rays[piece][square]:
+            for target in ray:
+                if pieces[target] != EMPTY:
+                    if owners[target] != colour:
+                        return True
+                    break
+
+    return False
+
+
+def find_uncovered_lines(
+    board: Board, player_colour: Colour, square: int
+) -> list[tuple[int, ...]]:
+    """
+    Finds lines where one of the player's sliders would see through square to
+    capture a piece on the other side if square was emptied.
+
+    Returns: The squares after the slider up to and including the piece it
+    would capture, for each line.
+    """
+
+    uncovered_lines = []
+    pieces = board.pieces
+    owners = board.owners
+    geometry = board.geometry
+    colour = player_colour.value
+
+    for rays, slider, lines in (
+        (geometry.rook_rays[square], ROOK, ROOK_LINES),
+        (geometry.bishop_rays[square], BISHOP, BISHOP_LINES),
+    ):
+        for line in lines:
+            # First piece looking each way along the line through square
+            ends = []
+            for ray in (rays[line[0]], rays[line[1]]):
+                for i, target in enumerate(ray):
+                    if pieces[target] != EMPTY:
+                        ends.append((target, ray[:i]))
+                        break
+
+            if len(ends) < 2:
+                continue
+            for (ours, _), (theirs, _) in (ends, ends[::-1]):
+                if (
+                    owners[ours] == colour
+                    and (pieces[ours] == slider or pieces[ours] == QUEEN)
+                    and owners[theirs] != colour
+                ):
+                    path = ends[0][1] + (square,) + ends[1][1] + (theirs,)
+                    uncovered_lines.append(path)
+                    break
+
+    return uncovered_lines
+
+
+def pick_random_move(
+    board: Board,
+    player_pieces: PlayerPieces,
+    player_colour: Colour,
+    rng: random.Random,
+) -> Optional[int]:
+    pseudo_moves, legal_moves, captures, attacks = board.move_buffers
+    generate_pseudo_moves(board, player_pieces, player_colour, pseudo_moves)
+    possible_moves = find_legal_moves(
+        board, player_pieces, player_colour, pseudo_moves, legal_moves
+    )
 
-    captures = find_captures(possible_moves)
+    captures = find_captures(possible_moves, captures)
 
     # Prioritise captures, then attacks, then regular moves
     if captures:
         # Todo: Prioritise capturing higher value pieces.
-        return random.choice(captures)
-    elif attacks := find_attacks(board, player_pieces, player_colour, possible_moves):
-        return random.choice(attacks)
+        return rng.choice(captures)
+    elif attacks := find_attacks(
+        board, player_pieces, player_colour, possible_moves, attacks
+    ):
+        return rng.choice(attacks)
     elif possible_moves:
-        return random.choice(possible_moves)
+        return rng.choice(possible_moves)
     else:
         return None
@@ -1,6 +1,6 @@
 import pygame
 
-from config.settings import WINDOW_HEIGHT
+from config.settings import WINDOW_HEIGHT, ROTATION_STEPS
 
 
 class FallingSprite(pygame.sprite.Sprite):
@@ -10,6 +10,7 @@ class FallingSprite(pygame.sprite.Sprite):
         self.rect = self.image.get_rect(center=(pos_x, pos_y))
         self.speed_y = speed
         self.angle = 0
+        self.step = 0
         self.rotate_speed = rotate_speed
 
     def update(self, dt: float) -> None:
@@ -25,9 +26,14 @@ class FallingSprite(pygame.sprite.Sprite):
         # Calculate rotation speed based on desired speed and max distance
         self.angle += (self.rotate_speed) / max_distance
 
-        # Rotate the working copy of the image using smoothscale
-        # This is where the performance hit happens.
-        self.image = pygame.transform.rotate(self.original_image, self.angle)
+        # Rotating every frame was slow, so the piece only rotates again once
+        # it turns past the next of ROTATION_STEPS even angles
+        step = round(self.angle * ROTATION_STEPS / 360) % ROTATION_STEPS
+        if step != self.step:
+            self.step = step
+            self.image = pygame.transform.rotate(
+                self.original_image, step * 360 / ROTATION_STEPS
+            )
 
         # Check for screen bottom and reset (optional)
         if self.rect.top > WINDOW_HEIGHT:
@@ -1,18 +1,9 @@
-from components.chess import Piece
+from components.chess import Piece, SUMMON_COST_MAP
 from components.animationplayer import AnimationPlayer
 from components.button import Button
 from config.assets import GAME_FONT
 from config.constants import WHITE
 
-SUMMON_COST_MAP = {
-    Piece.PAWN: 1,
-    Piece.KNIGHT: 3,
-    Piece.BISHOP: 3,
-    Piece.ROOK: 5,
-    Piece.QUEEN: 9,
-    Piece.KING: 2,
-}
-
 
 class Flame:
     def __init__(
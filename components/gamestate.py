@@ -0,0 +1,303 @@
+from typing import Callable, Optional
+from array import array
+from collections import deque
+import random
+import time
+
+from components.chess import (
+    Colour,
+    Piece,
+    Outcome,
+    pick_random_move,
+    pass_turn,
+    play_move,
+    perform_capture,
+    move_capture,
+)
+from components.boardgeneration import (
+    generate_empty_board,
+    generate_empty_player_pieces,
+    generate_player_regions,
+    place_pieces_randomly,
+    place_king_randomly,
+)
+
+MAX_MOVES_SINCE_DEATH = 200
+SEED_BITS = 64
+# Logged for passed turns. Cell 0 is always padding so no real move is 0
+NO_MOVE = 0
+# Turns played ahead by speculate(), more than a fast late game plays before
+# there is time to catch up
+SPECULATION_TURNS = 16
+
+
+def random_policy(state: "GameState") -> Optional[int]:
+    """A random capture, then a random attack, then any random move."""
+    return pick_random_move(
+        state.board, state.player_pieces, state.active_player, state.rng
+    )
+
+
+# Picks the active player's move, or None if they can't move
+Policy = Callable[["GameState"], Optional[int]]
+
+
+class GameState:
+    """
+    The rules of a fight without any of the drawing, so games can be simulated
+    headless. The Game scene renders one of these and calls step() whenever
+    the last move has finished animating.
+    """
+
+    def __init__(
+        self,
+        level: dict,
+        seed: Optional[int] = None,
+        policies: Optional[dict[Colour, Policy]] = None,
+    ) -> None:
+        # Every random choice in the game comes from here, so a seed replays
+        # the same board and the same moves
+        if seed is None:
+            seed = random.getrandbits(SEED_BITS)
+        # Any int works, but it's kept to what a replay can store
+        self.seed = seed % (1 << SEED_BITS)
+        self.rng = random.Random(self.seed)
+        # Players without a policy move randomly
+        self.policies = policies or {}
+
+        squares, width, height = level["board"]
+
+        # The first player is the one summoning pieces
+        self.active_players = [Colour.WHITE]
+        for colour in level["opponents"].keys():
+            self.active_players.append(colour)
+
+        self.alive_players = {player: True for player in self.active_players}
+
+        self.board = generate_empty_board(squares, width, height, self.rng)
+        self.player_pieces = generate_empty_player_pieces(
+            self.board, self.active_players
+        )
+        self.player_regions = generate_player_regions(
+            self.active_players, width, height
+        )
+
+        place_king_randomly(
+            self.board,
+            self.player_pieces,
+            self.active_players[0],
+            self.player_regions,
+            True,
+            self.rng,
+        )
+
+        for colour, pieces in level["opponents"].items():
+            place_king_randomly(
+                self.board,
+                self.player_pieces,
+                colour,
+                self.player_regions,
+                False,
+                self.rng,
+            )
+            place_pieces_randomly(
+                self.board,
+                self.player_pieces,
+                colour,
+                self.player_regions,
+                pieces,
+                self.rng,
+            )
+
+        self.turn = 0  # Index in self.active_players array
+        self.active_player = self.active_players[self.turn]
+        self.moves = 0
+        self.moves_since_death = 0
+        self.max_moves_since_death = MAX_MOVES_SINCE_DEATH
+
+        self.player_made_move = True
+
+        # Everything a replay needs on top of the seed, one move per turn
+        self.summons: list[tuple[tuple[int, int], Piece]] = []
+        self.played_moves = array("I")
+
+        self.gameover = False
+        self.outcome = Outcome.DRAW
+
+        # Moves picked ahead of time by speculate(), as (position hash, move,
+        # random state after picking it), and the copy of the game that
+        # picked them
+        self.speculated: deque[tuple[int, int, tuple]] = deque()
+        self.ahead: Optional[GameState] = None
+
+    def copy(self) -> "GameState":
+        """
+        Copies the game so it can be played out without touching this one. The
+        copy carries on from the same random state unless it is reseeded.
+        """
+        state = object.__new__(GameState)
+        state.__dict__.update(self.__dict__)
+        state.active_players = self.active_players[:]
+        state.alive_players = self.alive_players.copy()
+        state.rng = random.Random()
+        state.rng.setstate(self.rng.getstate())
+        state.summons = self.summons[:]
+        state.played_moves = self.played_moves[:]
+        state.board = self.board.copy()
+        state.player_pieces = {
+            colour: pieces.copy() for colour, pieces in self.player_pieces.items()
+        }
+        state.speculated = deque()
+        state.ahead = None
+        return state
+
+    def can_summon(self, square: tuple[int, int]) -> bool:
+        """Returns: If the first player is allowed to summon a piece on square."""
+
+        region = self.player_regions[self.active_players[0]]
+        return (
+            square[0] >= region[0]
+            and square[0] < region[0] + region[2]
+            and square[1] >= region[1]
+            and square[1] < region[1] + region[3]
+            and square in self.board
+            and self.board[square] is None
+        )
+
+    def summon(self, square: tuple[int, int], piece: Piece) -> None:
+        index = self.board.place(square, piece, self.active_players[0])
+        self.player_pieces[self.active_players[0]].append(index)
+        self.summons.append((square, piece))
+        self.drop_speculation()
+
+    def speculate(self, seconds: float) -> None:
+        """
+        Plays ahead on a copy of the game for up to seconds, caching each move
+        against the position it was picked in. step() plays the cached moves
+        instead of picking them again while the game follows those positions.
+        Stops at players with their own policy, they think for themselves.
+        """
+
+        deadline = time.perf_counter() + seconds
+        if self.ahead is None:
+            self.ahead = self.copy()
+        ahead = self.ahead
+
+        while len(self.speculated) < SPECULATION_TURNS and not ahead.gameover:
+            player = ahead.next_player
+            if ahead.alive_players[player] and player in ahead.policies:
+                break
+            if time.perf_counter() > deadline:
+                break
+
+            key = ahead.board.hash
+            turns = len(ahead.played_moves)
+            ahead.step()
+            # Stalemate, the game ended without a turn being played
+            if len(ahead.played_moves) == turns:
+                break
+            self.speculated.append((key, ahead.played_moves[-1], ahead.rng.getstate()))
+
+    def take_speculated(self) -> Optional[int]:
+        """Returns: The move cached for this position, if speculate() got here."""
+
+        if self.speculated and self.speculated[0][0] == self.board.hash:
+            _, move, rng_state = self.speculated.popleft()
+            # Carry on from the same random state the copy did, so the
+            # cached moves after this one still line up
+            self.rng.setstate(rng_state)
+            return move
+        self.drop_speculation()
+        return None
+
+    def drop_speculation(self) -> None:
+        self.speculated.clear()
+        self.ahead = None
+
+    @property
+    def next_player(self) -> Colour:
+        """The player whose turn step() plays next."""
+
+        return self.active_players[self.turn]
+
+    def step(self, move: Optional[int] = None) -> Optional[tuple[int, Optional[Piece]]]:
+        """
+        Plays the turn of the next player in the rotation. Replays pass the
+        logged move (or NO_MOVE) instead of letting the player pick one.
+
+        Returns: The move played and the piece it captured, or None if the
+        player is dead, has no moves or the game is over.
+        """
+
+        if self.gameover:
+            return None
+
+        # Stalemate (No piece made a move for any player for a turn)
+        if self.turn == 0:
+            if not self.player_made_move:
+                self.gameover = True
+                return None
+            self.player_made_move = False
+
+        self.active_player = self.active_players[self.turn]
+        self.turn += 1
+        self.turn %= len(self.active_players)
+
+        if move is None:
+            move = self.take_speculated()
+        else:
+            self.drop_speculation()
+
+        if not self.alive_players[self.active_player]:
+            pass_turn(self.board, self.active_player)
+            self.played_moves.append(NO_MOVE)
+            return None
+
+        if move is None:
+            policy = self.policies.get(self.active_player, random_policy)
+            move = policy(self)
+        if not move:
+            # Can't make move
+            pass_turn(self.board, self.active_player)
+            self.played_moves.append(NO_MOVE)
+            return None
+
+        self.player_made_move = True
+
+        captured_piece = play_move(
+            self.board, self.player_pieces, self.active_player, move
+        )
+        perform_capture(self.board, self.player_pieces, move)
+        self.played_moves.append(move)
+
+        self.moves += 1
+        self.moves_since_death += 1
+
+        # A player just lost... lol
+        if captured_piece == Piece.KING:
+            self.alive_players[move_capture(move)] = False
+            self.moves_since_death = 0
+            self.update_outcome()
+
+        if self.moves_since_death == self.max_moves_since_death:
+            self.gameover = True
+
+        return move, captured_piece
+
+    def update_outcome(self) -> None:
+        still_alive = [player for player, alive in self.alive_players.items() if alive]
+
+        if self.active_players[0] not in still_alive:
+            self.gameover = True
+            self.outcome = Outcome.LOSE
+
+        elif len(still_alive) == 1:
+            self.gameover = True
+            self.outcome = Outcome.WIN
+
+    def run(self) -> Outcome:
+        """Steps until the game is over. Returns: The outcome for the first player."""
+
+        while not self.gameover:
+            self.step()
+        return self.outcome
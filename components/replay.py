@@ -0,0 +1,159 @@
+from typing import Iterator, Optional
+from dataclasses import dataclass, field
+from array import array
+import os
+import struct
+import sys
+import zlib
+
+from components.chess import Piece, Outcome, PIECES
+from components.gamestate import GameState
+from components.levels import levels
+
+# A replay file is a header followed by one record per game, so games can be
+# appended to an existing file and read back one at a time. Little endian:
+#   header: magic b"CTKR", version u8, flags u8
+#   record: body size u32, body (zlib compressed if the COMPRESSED flag is set)
+#   body:   seed u64, level u16, outcome u8, summon count u16, move count u32,
+#           summons as (x u8, y u8, piece u8), then packed moves as u32
+# Moves are logged one per turn (NO_MOVE for passed turns), so a replay plays
+# back without picking any moves
+MAGIC = b"CTKR"
+VERSION = 1
+COMPRESSED = 0b1
+
+HEADER = struct.Struct("<4sBB")
+RECORD_SIZE = struct.Struct("<I")
+RECORD = struct.Struct("<QHBHI")
+SUMMON = struct.Struct("<BBB")
+
+# Outcome codes, 0 for a game that didn't finish
+OUTCOMES = (None,) + tuple(Outcome)
+
+
+@dataclass
+class Replay:
+    seed: int
+    level: int  # Index in components.levels
+    summons: list[tuple[tuple[int, int], Piece]] = field(default_factory=list)
+    moves: array = field(default_factory=lambda: array("I"))
+    outcome: Optional[Outcome] = None
+
+    @classmethod
+    def from_state(cls, state: GameState, level: int) -> "Replay":
+        return cls(
+            state.seed,
+            level,
+            state.summons[:],
+            state.played_moves[:],
+            state.outcome if state.gameover else None,
+        )
+
+    def restore(self) -> GameState:
+        """Returns: The game as it was at the end of the replay."""
+
+        state = GameState(levels[self.level], self.seed)
+        for square, piece in self.summons:
+            state.summon(square, piece)
+        for move in self.moves:
+            state.step(move)
+        if self.outcome is not None:
+            # The turn that found a stalemate didn't log a move
+            state.run()
+        return state
+
+
+def encode_replay(replay: Replay) -> bytes:
+    outcome = OUTCOMES.index(replay.outcome)
+    parts = [
+        RECORD.pack(
+            replay.seed, replay.level, outcome, len(replay.summons), len(replay.moves)
+        )
+    ]
+    for (x, y), piece in replay.summons:
+        parts.append(SUMMON.pack(x, y, piece.value))
+
+    moves = replay.moves
+    if sys.byteorder == "big":
+        moves = moves[:]
+        moves.byteswap()
+    parts.append(moves.tobytes())
+    return b"".join(parts)
+
+
+def decode_replay(body: bytes) -> Replay:
+    seed, level, outcome, summon_count, move_count = RECORD.unpack_from(body)
+    offset = RECORD.size
+
+    summons = []
+    for x, y, piece in SUMMON.iter_unpack(
+        body[offset : offset + summon_count * SUMMON.size]
+    ):
+        summons.append(((x, y), PIECES[piece]))
+    offset += summon_count * SUMMON.size
+
+    moves = array("I")
+    moves.frombytes(body[offset : offset + move_count * moves.itemsize])
+    if sys.byteorder == "big":
+        moves.byteswap()
+
+    return Replay(seed, level, summons, moves, OUTCOMES[outcome])
+
+
+def read_header(file) -> int:
+    """Returns: The file's flags."""
+
+    magic, version, flags = HEADER.unpack(file.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("Not a replay file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported replay version {version}")
+    return flags
+
+
+class ReplayWriter:
+    """
+    Appends replays to a file, creating it if it doesn't exist. An existing
+    file keeps the compression it was created with.
+    """
+
+    def __init__(self, path: str | os.PathLike, compress: bool = False) -> None:
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as file:
+                compress = bool(read_header(file) & COMPRESSED)
+            self.file = open(path, "ab")
+        else:
+            self.file = open(path, "wb")
+            self.file.write(HEADER.pack(MAGIC, VERSION, COMPRESSED if compress else 0))
+        self.compress = compress
+
+    def write(self, replay: Replay) -> None:
+        body = encode_replay(replay)
+        if self.compress:
+            body = zlib.compress(body)
+        self.file.write(RECORD_SIZE.pack(len(body)))
+        self.file.write(body)
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "ReplayWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_replays(path: str | os.PathLike) -> Iterator[Replay]:
+    """Decodes the replays in a file one record at a time."""
+
+    with open(path, "rb") as file:
+        compressed = read_header(file) & COMPRESSED
+        while size_bytes := file.read(RECORD_SIZE.size):
+            (size,) = RECORD_SIZE.unpack(size_bytes)
+            body = file.read(size)
+            if len(body) != size:
+                raise ValueError("Replay file ends part way through a record")
+            if compressed:
+                body = zlib.decompress(body)
+            yield decode_replay(body)
@@ -0,0 +1,161 @@
+from typing import Iterable, Optional
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import math
+import os
+import time
+
+from components.chess import Colour, Piece, Outcome
+from components.gamestate import GameState, Policy
+
+# A player's summons, as (square, piece) pairs
+Placement = Iterable[tuple[tuple[int, int], Piece]]
+
+# Normal quantile for 95% confidence intervals
+Z_95 = 1.959964
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    games: int
+    wins: int
+    draws: int
+    losses: int
+    moves: int
+    seconds: float
+    workers: int
+
+    def count(self, outcome: Outcome) -> int:
+        match outcome:
+            case Outcome.WIN:
+                return self.wins
+            case Outcome.DRAW:
+                return self.draws
+            case Outcome.LOSE:
+                return self.losses
+
+    def rate(self, outcome: Outcome) -> float:
+        return self.count(outcome) / self.games if self.games else 0.0
+
+    def confidence_interval(
+        self, outcome: Outcome, z: float = Z_95
+    ) -> tuple[float, float]:
+        """Returns: The Wilson score interval of the outcome's rate."""
+
+        if not self.games:
+            return (0.0, 1.0)
+
+        n = self.games
+        p = self.count(outcome) / n
+        denominator = 1 + z * z / n
+        centre = (p + z * z / (2 * n)) / denominator
+        spread = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+        return (max(0.0, centre - spread), min(1.0, centre + spread))
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.seconds if self.seconds else 0.0
+
+    @property
+    def moves_per_second(self) -> float:
+        return self.moves / self.seconds if self.seconds else 0.0
+
+
+def create_state(
+    level: dict,
+    placement: Placement,
+    seed: Optional[int] = None,
+    policies: Optional[dict[Colour, Policy]] = None,
+) -> GameState:
+    """
+    Sets up a level (seeded so the layout can be reproduced) and summons the
+    player's pieces the same way dragging them onto the board does.
+    """
+
+    state = GameState(level, seed, policies)
+    for square, piece in placement:
+        if not state.can_summon(square):
+            raise ValueError(f"Can't summon {piece} on {square}")
+        state.summon(square, piece)
+    return state
+
+
+def play_games(state: GameState, first_seed: int, games: int) -> tuple[int, ...]:
+    """
+    Plays copies of state to the end, seeding each game with its own number.
+
+    Returns: Wins, draws, losses and the moves played.
+    """
+
+    wins = draws = losses = moves = 0
+    for seed in range(first_seed, first_seed + games):
+        game = state.copy()
+        game.rng.seed(seed)
+        outcome = game.run()
+        moves += game.moves
+
+        if outcome == Outcome.WIN:
+            wins += 1
+        elif outcome == Outcome.DRAW:
+            draws += 1
+        else:
+            losses += 1
+
+    return wins, draws, losses, moves
+
+
+# The starting state, sent to each worker process once by its initializer
+# rather than pickled into every task
+_worker_state: Optional[GameState] = None
+
+
+def _init_worker(state: GameState) -> None:
+    global _worker_state
+    _worker_state = state
+
+
+def _play_chunk(chunk: tuple[int, int]) -> tuple[int, ...]:
+    return play_games(_worker_state, *chunk)
+
+
+def simulate(
+    state: GameState,
+    games: int,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> SimulationResult:
+    """
+    Plays `games` independent games from state across a process pool. Game i
+    is seeded with seed + i, so results don't depend on the number of workers.
+
+    workers defaults to every core. With one worker the games are played in
+    this process.
+    """
+
+    if games < 1:
+        raise ValueError("Need at least one game to simulate")
+
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, games))
+    if chunk_size is None:
+        # A few chunks per worker so a slow chunk doesn't leave the rest idle
+        chunk_size = max(1, math.ceil(games / (workers * 4)))
+
+    chunks = [
+        (first_seed, min(chunk_size, seed + games - first_seed))
+        for first_seed in range(seed, seed + games, chunk_size)
+    ]
+
+    start = time.perf_counter()
+    if workers == 1:
+        totals = [play_games(state, *chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(state,)
+        ) as executor:
+            totals = list(executor.map(_play_chunk, chunks))
+    seconds = time.perf_counter() - start
+
+    wins, draws, losses, moves = (sum(column) for column in zip(*totals))
+    return SimulationResult(games, wins, draws, losses, moves, seconds, workers)
@@ -0,0 +1,106 @@
+from typing import Optional
+from array import array
+
+DEFAULT_TABLE_MB = 8
+
+# What a stored score says about the position's real score
+EXACT = 0
+LOWER = 1  # At least the score, the search failed high
+UPPER = 2  # At most the score, the search failed low
+
+# Cleared slots have no depth, so any search can use them
+EMPTY_DEPTH = -1
+
+# keys (8) + moves (4) + scores (4) + depths (1) + bounds (1) + ages (1)
+ENTRY_BYTES = 19
+BUCKET_SIZE = 2
+
+
+class TranspositionTable:
+    """
+    Fixed size table of search results keyed by position hash. Entries live
+    in flat preallocated arrays and the memory never grows past the cap.
+
+    Every hash maps to a bucket of two slots. The first keeps whichever entry
+    was searched deepest (or belongs to the current search), the second is
+    always replaced, so a deep result survives while shallow ones still get
+    stored.
+    """
+
+    def __init__(self, megabytes: float = DEFAULT_TABLE_MB) -> None:
+        buckets = max(1, int(megabytes * 1024 * 1024) // (ENTRY_BYTES * BUCKET_SIZE))
+        self.buckets = buckets
+        size = buckets * BUCKET_SIZE
+
+        self.keys = array("Q", bytes(8 * size))
+        self.moves = array("I", bytes(4 * size))
+        self.scores = array("i", bytes(4 * size))
+        self.depths = array("b", [EMPTY_DEPTH]) * size
+        self.bounds = array("B", bytes(size))
+        self.ages = array("B", bytes(size))
+
+        # Bumped by new_search() so results from old moves give way
+        self.age = 0
+
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        # Stores that threw away another position's result
+        self.overwrites = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.keys)
+
+    def new_search(self) -> None:
+        self.age = (self.age + 1) & 0xFF
+
+    def clear(self) -> None:
+        self.depths[:] = array("b", [EMPTY_DEPTH]) * self.size
+        self.age = 0
+
+    def probe(self, key: int) -> Optional[tuple[int, int, int, int]]:
+        """Returns: Depth, score, bound and best move stored for key."""
+
+        self.probes += 1
+        slot = key % self.buckets * BUCKET_SIZE
+        for slot in (slot, slot + 1):
+            if self.keys[slot] == key and self.depths[slot] != EMPTY_DEPTH:
+                self.hits += 1
+                return (
+                    self.depths[slot],
+                    self.scores[slot],
+                    self.bounds[slot],
+                    self.moves[slot],
+                )
+        return None
+
+    def store(self, key: int, depth: int, score: int, bound: int, move: int) -> None:
+        self.stores += 1
+        slot = key % self.buckets * BUCKET_SIZE
+
+        # Depth preferred slot, unless it holds a deeper result for another
+        # position from this search
+        if (
+            self.keys[slot] != key
+            and self.depths[slot] > depth
+            and self.ages[slot] == self.age
+        ):
+            slot += 1
+
+        if self.depths[slot] != EMPTY_DEPTH and self.keys[slot] != key:
+            self.overwrites += 1
+
+        self.keys[slot] = key
+        self.depths[slot] = depth
+        self.scores[slot] = score
+        self.bounds[slot] = bound
+        self.moves[slot] = move
+        self.ages[slot] = self.age
@@ -1,9 +1,16 @@
+from typing import Any, Iterable
 import sys
 import platform
+import time
 import pygame
 
-from config.settings import WINDOW_SETUP, CAPTION
-from utilities.spriteloading import slice_sheet
+from config.settings import (
+    WINDOW_SETUP,
+    CAPTION,
+    SPRITE_CACHE_MB,
+)
+from utilities.spriteloading import load_atlas
+from utilities.spritecache import SpriteCache
 
 # -------------------------------- DO NOT MOVE! --------------------------------
 # NOTE: Only /config/core.py should be importing window and clock
@@ -23,23 +30,68 @@ pygame.display.set_caption(CAPTION)
 # ------------------------------------------------------------------------------
 
 # Load all sprite files (Ideally .png/.webp or .jpg for browser compatibility)
-CHESS_PIECES = slice_sheet("assets/chess_pieces.png", 64, 96)
-CHESS_SILHOUETTES = slice_sheet("assets/piece_silhouettes.png", 64, 96)
-SOUL_FLAMES = slice_sheet("assets/soul_flames.png", 64, 64)
-SOUL_FLAMES = [pygame.transform.scale(sprite, (128, 128)) for sprite in SOUL_FLAMES]
+# Only what the main menu draws is loaded up front, see LOADERS for the rest
+CHESS_PIECES = load_atlas("assets/chess_pieces.png", 64, 96)
 
-# Load all audio files (Must be .ogg file for browser compatibility)
-THEME_SONG = pygame.mixer.Sound("assets/theme.ogg")
+# Sprites scaled by scenes, kept between scene switches
+sprite_cache = SpriteCache(SPRITE_CACHE_MB)
 
-CAPTURE_SFX = pygame.mixer.Sound("assets/capture.ogg")
-CHECKMATE_SFX = pygame.mixer.Sound("assets/checkmate.ogg")
-LOST_SFX = pygame.mixer.Sound("assets/lost.ogg")
-STALEMATE_SFX = pygame.mixer.Sound("assets/stalemate.ogg")
-SUMMON_SFX = pygame.mixer.Sound("assets/summon.ogg")
-WIN_SFX = pygame.mixer.Sound("assets/win.ogg")
+# Audio files (Must be .ogg file for browser compatibility)
+# The theme is streamed with pygame.mixer.music instead of decoded up front,
+# which took longer than loading everything else together
+THEME_SONG = "assets/theme.ogg"
 
 # Load all font files (Must be .ttf file for brower compatibility)
 DEBUG_FONT = pygame.font.Font("assets/joystix.ttf", 10)
 GAME_FONT_SMALL = pygame.font.Font("assets/joystix.ttf", 16)
 GAME_FONT = pygame.font.Font("assets/joystix.ttf", 32)
 GAME_FONT_BIG = pygame.font.Font("assets/joystix.ttf", 100)
+
+
+# Loaded the first time they're used as config.assets.NAME, or ahead of time
+# by prefetch(), so the first frame doesn't wait on assets it doesn't draw
+LOADERS = {
+    "CHESS_SILHOUETTES": lambda: load_atlas("assets/piece_silhouettes.png", 64, 96),
+    "SOUL_FLAMES": lambda: load_atlas("assets/soul_flames.png", 64, 64, (128, 128)),
+    "CAPTURE_SFX": lambda: pygame.mixer.Sound("assets/capture.ogg"),
+    "CHECKMATE_SFX": lambda: pygame.mixer.Sound("assets/checkmate.ogg"),
+    "LOST_SFX": lambda: pygame.mixer.Sound("assets/lost.ogg"),
+    "STALEMATE_SFX": lambda: pygame.mixer.Sound("assets/stalemate.ogg"),
+    "SUMMON_SFX": lambda: pygame.mixer.Sound("assets/summon.ogg"),
+    "WIN_SFX": lambda: pygame.mixer.Sound("assets/win.ogg"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in LOADERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    asset = LOADERS[name]()
+    # Later lookups find it without coming back here
+    globals()[name] = asset
+    return asset
+
+
+def is_loaded(name: str) -> bool:
+    return name in globals()
+
+
+def prefetch(names: Iterable[str], seconds: float) -> float:
+    """
+    Loads names that aren't loaded yet for about seconds, at least one per
+    call, so loading can be spread over frames.
+
+    Returns: The fraction of names loaded.
+    """
+
+    names = list(names)
+    deadline = time.perf_counter() + seconds
+    for name in names:
+        if is_loaded(name):
+            continue
+        __getattr__(name)
+        if time.perf_counter() > deadline:
+            break
+
+    if not names:
+        return 1.0
+    return sum(is_loaded(name) for name in names) / len(names)
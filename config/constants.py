@@ -1,3 +1,4 @@
+from enum import Enum, auto
 import pygame
 from components.chess import Colour
 
@@ -27,3 +28,11 @@ FACTION_COLOUR_MAP = {
     Colour.BLUE: pygame.Color(75, 158, 217),
     Colour.PURPLE: pygame.Color(184, 73, 216),
 }
+
+
+# How fast a fight plays out, the speed button cycles through them in order
+class Speed(Enum):
+    NORMAL = auto()
+    FAST = auto()  # Moves animate FAST_FORWARD times quicker
+    MAX = auto()  # As many moves as fit in MAX_SPEED_FRAME_MS each frame
+    RESOLVE = auto()  # Plays the rest of the fight at once
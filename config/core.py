@@ -1,14 +1,17 @@
 import asyncio  # For running the game in browser
+import time
 import pygame
 
 from utilities.decorators import singleton
 from utilities.typehints import InputBuffer
 from baseclasses.scenemanager import SceneManager
-from config.settings import FPS, action_mappings
+from config.settings import FPS, TICK_RATE, MAX_TICKS_PER_FRAME, action_mappings
 from config.input import InputState, MouseButton, Action
 from config.assets import window, clock, THEME_SONG
 from scenes.mainmenu import MainMenu  # Initial scene
 
+TICK = 1 / TICK_RATE
+
 
 @singleton
 class Core:
@@ -20,28 +23,39 @@ class Core:
 
     def __init__(self) -> None:
         self.scene_manager = SceneManager(MainMenu)
-        pygame.mixer.Channel(0).play(THEME_SONG, -1)
+        self.accumulator = 0.0
+        pygame.mixer.music.load(THEME_SONG)
+        pygame.mixer.music.play(-1)
         pygame.mixer.Channel(1).set_volume(30)
         pygame.mixer.Channel(2).set_volume(30)
+        # Input waiting for the next tick, so presses aren't lost on frames
+        # that don't tick
+        self.pending_input = self.get_input()
 
     async def run(self) -> None:
         while True:
             elapsed_time = clock.tick(FPS)
             dt = elapsed_time / 1000.0  # Convert to seconds
+            self.accumulator = min(self.accumulator + dt, MAX_TICKS_PER_FRAME * TICK)
 
             self.scene_manager.switched = False
 
             self.check_for_window_events()
-            input_buffer = self.get_input()
+            self.latch_input(self.get_input())
 
             if not pygame.mouse.get_focused():
-                pygame.mixer.Channel(0).pause()
+                pygame.mixer.music.pause()
             else:
-                pygame.mixer.Channel(0).unpause()
+                pygame.mixer.music.unpause()
+
+            ticks = 0
+            while self.accumulator >= TICK:
+                self.tick(first_of_frame=ticks == 0)
+                self.accumulator -= TICK
+                ticks += 1
 
-            self.scene_manager.handle_input(input_buffer)
-            self.scene_manager.update(dt)
-            self.scene_manager.render(window)
+            # How far the frame is between the last tick and the next one
+            dirty_rects = self.scene_manager.render(window, self.accumulator / TICK)
 
             # For easy performance testing
             # fps_debug = DEBUG_FONT.render(
@@ -51,9 +65,37 @@ class Core:
             # window.blit(fps_debug, (0, 0))
             # window.blit(dt_debug, (0, 10))
 
-            pygame.display.flip()
+            # Only push what changed to the screen when the scene knows
+            if dirty_rects is None:
+                pygame.display.flip()
+            elif dirty_rects:
+                pygame.display.update(dirty_rects)
             await asyncio.sleep(0)
 
+    def tick(self, first_of_frame: bool = True) -> None:
+        """
+        Updates the scene by one fixed step, headless runs can call it directly.
+        Scenes spend their per frame budgets once across all of a frame's ticks.
+        """
+
+        if first_of_frame:
+            self.scene_manager.frame_start = time.perf_counter()
+        self.scene_manager.handle_input(self.pending_input)
+        self.scene_manager.update(TICK)
+
+        # Presses and releases only count for the first tick that sees them
+        for buffer in self.pending_input:
+            for states in buffer.values():
+                states[InputState.PRESSED] = False
+                states[InputState.RELEASED] = False
+
+    def latch_input(self, input_buffer: InputBuffer) -> None:
+        for pending, buffer in zip(self.pending_input, input_buffer):
+            for key, states in buffer.items():
+                states[InputState.PRESSED] |= pending[key][InputState.PRESSED]
+                states[InputState.RELEASED] |= pending[key][InputState.RELEASED]
+        self.pending_input = input_buffer
+
     def get_input(self) -> InputBuffer:
         # pygame.key.get_just_pressed() and get_just_released() aren't recognized by browser yet :(
         keys_held = pygame.key.get_pressed()
@@ -104,9 +146,9 @@ class Core:
 
             # Can use these events to pause audio tracks or whatever else you need
             elif event.type == pygame.WINDOWFOCUSLOST:
-                pygame.mixer.Channel(0).pause()
+                pygame.mixer.music.pause()
             elif event.type == pygame.WINDOWFOCUSGAINED:
-                pygame.mixer.Channel(0).unpause()
+                pygame.mixer.music.unpause()
             elif event.type == pygame.VIDEORESIZE:
                 pass
 
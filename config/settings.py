@@ -1,6 +1,7 @@
 import pygame
 
 from config.input import Action
+from config.constants import Speed
 
 
 WINDOW_WIDTH = 640 * 2
@@ -18,6 +19,35 @@ WINDOW_SETUP = {
 
 CAPTION = "Capture the King"
 FPS = 60
+# The game updates at a fixed rate however fast frames are drawn, frames in
+# between two updates are drawn part way between them
+TICK_RATE = 60
+# Updates caught up on per frame at most, a long stall is dropped instead
+MAX_TICKS_PER_FRAME = 4
+
+# Set to a file path to append a replay of every fight to it
+REPLAY_PATH = None
+
+# Opponents search for their best move instead of moving randomly. They think
+# while the last move animates, and take at most this long once it's done
+SEARCH_OPPONENTS = False
+SEARCH_BUDGET_MS = 8
+# Searching and playing ahead carry on while the last move animates, this
+# much of each frame
+SEARCH_SLICE_MS = 4
+
+# Speed fights start at, RESOLVE skips straight to the result for playtesting
+SIMULATION_SPEED = Speed.NORMAL
+FAST_FORWARD = 4
+MAX_SPEED_FRAME_MS = 8
+
+# Memory scaled sprites shared between scenes can take up
+SPRITE_CACHE_MB = 32
+# Falling pieces on the menus turn in this many even steps, 1 degree apart so
+# the spin still looks smooth
+ROTATION_STEPS = 360
+# The main menu loads the game's assets for this long each frame
+PREFETCH_MS = 4
 
 
 action_mappings = {
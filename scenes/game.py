@@ -1,12 +1,23 @@
 from typing import Optional
-import math
 import random
 import pygame
 
 from utilities.typehints import ActionBuffer, MouseBuffer
-from config.input import InputState, MouseButton
+from config.input import InputState, MouseButton, Action
 from baseclasses.scenemanager import Scene, SceneManager
-from config.settings import WINDOW_WIDTH, WINDOW_HEIGHT, WINDOW_SIZE, WINDOW_CENTRE
+from config.settings import (
+    WINDOW_WIDTH,
+    WINDOW_HEIGHT,
+    WINDOW_SIZE,
+    WINDOW_CENTRE,
+    REPLAY_PATH,
+    SEARCH_OPPONENTS,
+    SEARCH_BUDGET_MS,
+    SEARCH_SLICE_MS,
+    SIMULATION_SPEED,
+    FAST_FORWARD,
+    MAX_SPEED_FRAME_MS,
+)
 from config.constants import (
     BACKGROUND,
     LIGHT_SQUARE,
@@ -15,39 +26,30 @@ from config.constants import (
     WHITE,
     BLACK,
     EMPTY_SQUARE,
+    Speed,
 )
 from components.chess import (
     Colour,
     Piece,
     Move,
     Outcome,
-    pick_random_move,
-    play_move,
-    perform_capture,
-)
-from components.boardgeneration import (
-    generate_empty_board,
-    generate_empty_player_pieces,
-    place_pieces_randomly,
-    place_king_randomly,
+    decode_move,
+    find_piece_colour,
 )
+from components.gamestate import GameState, NO_MOVE
+from components.ai import SearchPolicy, finish_thinking
+from components.replay import Replay, ReplayWriter
 from components.animationplayer import AnimationPlayer
 from components.button import Button, blit_centered_text
 from components.flame import Flame
 from config.assets import (
     CHESS_PIECES,
-    CHESS_SILHOUETTES,
-    SOUL_FLAMES,
     GAME_FONT,
     GAME_FONT_BIG,
     GAME_FONT_SMALL,
-    CAPTURE_SFX,
-    CHECKMATE_SFX,
-    LOST_SFX,
-    STALEMATE_SFX,
-    SUMMON_SFX,
-    WIN_SFX,
+    sprite_cache,
 )
+import config.assets as assets
 from components.levels import levels
 from utilities.math import lerp, clamp
 import scenes.globals as globaldata
@@ -58,6 +60,17 @@ import scenes.win
 
 
 class Game(Scene):
+    ASSETS = (
+        "CHESS_SILHOUETTES",
+        "SOUL_FLAMES",
+        "CAPTURE_SFX",
+        "CHECKMATE_SFX",
+        "LOST_SFX",
+        "STALEMATE_SFX",
+        "SUMMON_SFX",
+        "WIN_SFX",
+    )
+
     def __init__(self, scene_manager: SceneManager) -> None:
         super().__init__(scene_manager)
 
@@ -70,7 +83,6 @@ class Game(Scene):
         self.mana_reward = current_level["mana_awarded"]
         self.name = current_level["name"]
         board = current_level["board"]
-        self.squares = board[0]
         self.board_size = (board[1], board[2])
 
         self.square_size = min(
@@ -81,16 +93,23 @@ class Game(Scene):
 
         self.piece_size = (self.square_size, self.square_size / 2 * 3)
         scaled_pieces = [
-            pygame.transform.scale(sprite, self.piece_size) for sprite in CHESS_PIECES
+            sprite_cache.scale(sprite, self.piece_size) for sprite in CHESS_PIECES
         ]
         self.piece_offset = (0, -self.piece_size[1] // 2)
 
-        self.active_players = [Colour.WHITE]
-        opponents = current_level["opponents"]
-        for colour in opponents.keys():
-            self.active_players.append(colour)
+        policies = None
+        if SEARCH_OPPONENTS:
+            policies = {
+                colour: SearchPolicy(SEARCH_BUDGET_MS)
+                for colour in current_level["opponents"]
+            }
 
-        self.alive_players = {player: True for player in self.active_players}
+        # All of the rules live in the state, the scene only draws it
+        self.state = GameState(current_level, policies=policies)
+        self.board = self.state.board
+        self.active_players = self.state.active_players
+        self.alive_players = self.state.alive_players
+        self.player_regions = self.state.player_regions
 
         self.player_piece_sprites = {}
         piece_colours = [
@@ -135,8 +154,10 @@ class Game(Scene):
             Piece.QUEEN: Colour.PURPLE,
         }
         for i, colour in enumerate(flame_colours):
-            anim = AnimationPlayer("idle", SOUL_FLAMES[i * 12 : i * 12 + 6], 0.2)
-            anim.add_animation("cast", SOUL_FLAMES[i * 12 + 7 : i * 12 + 12], 0.1)
+            anim = AnimationPlayer("idle", assets.SOUL_FLAMES[i * 12 : i * 12 + 6], 0.2)
+            anim.add_animation(
+                "cast", assets.SOUL_FLAMES[i * 12 + 7 : i * 12 + 12], 0.1
+            )
             anim.frame_index = random.randint(0, 4)
             hitbox = Button(
                 0, 100 * i + 40, 128, 80
@@ -150,32 +171,8 @@ class Game(Scene):
             (WINDOW_HEIGHT - self.square_size * self.board_size[1]) // 2,
         )
 
-        self.board = generate_empty_board(self.squares, *self.board_size)
-        self.player_pieces = generate_empty_player_pieces(self.active_players)
-
-        # First player (YOU) gets bottom half of board. Opponents get top half divided equally
-        self.player_regions: dict[Colour, tuple[int, int, int, int]] = {}
-        self.player_regions[self.active_players[0]] = (
-            0,
-            math.floor(self.board_size[1] / 2),
-            self.board_size[0],
-            math.ceil(self.board_size[1] / 2),
-        )
-        divided_width = math.floor(self.board_size[0] / (len(self.active_players) - 1))
-        for i in range(1, len(self.active_players)):
-            extra = 0
-            if i == len(self.active_players) - 1:
-                extra = self.board_size[0] - self.board_size[0] // (
-                    len(self.active_players) - 1
-                ) * (len(self.active_players) - 1)
-
-            colour = self.active_players[i]
-            self.player_regions[colour] = (
-                divided_width * (i - 1),
-                -0.8,
-                divided_width + extra,
-                math.floor(self.board_size[1] / 2) + 0.8,
-            )
+        # The squares never change during a fight, so they're drawn once
+        self.board_layer = self.render_board_layer()
 
         self.piece_silhouette = {}
         silhouette_order = [
@@ -186,44 +183,14 @@ class Game(Scene):
             Piece.QUEEN,
             Piece.KING,
         ]
-        for piece, sprite in zip(silhouette_order, CHESS_SILHOUETTES):
-            sprite = pygame.transform.scale(sprite, (32, 48))
+        for piece, sprite in zip(silhouette_order, assets.CHESS_SILHOUETTES):
+            sprite = sprite_cache.scale(sprite, (32, 48))
             self.piece_silhouette[piece] = sprite
 
-        place_king_randomly(
-            self.board,
-            self.player_pieces,
-            self.active_players[0],
-            self.player_regions,
-            True,
-        )
-
-        for colour, pieces in opponents.items():
-            place_king_randomly(
-                self.board,
-                self.player_pieces,
-                colour,
-                self.player_regions,
-                False,
-            )
-            place_pieces_randomly(
-                self.board,
-                self.player_pieces,
-                colour,
-                self.player_regions,
-                pieces,
-            )
-
         self.start_button = Button(
             WINDOW_WIDTH - 128, WINDOW_HEIGHT // 2 - 50, 128, 100
         )
 
-        self.turn = 0  # Index in self.active_players array
-        self.active_player = self.active_players[self.turn]
-        self.moves = 0
-        self.moves_since_death = 0
-        self.max_moves_since_death = 200
-
         self.starting_speed = 0.5
         self.move_speed = self.starting_speed
         self.move_speed_timer = self.starting_speed
@@ -233,14 +200,28 @@ class Game(Scene):
         self.active_captured_piece: Optional[Piece] = None
         self.active_piece_x = 0
         self.active_piece_y = 0
+        # Where the moving piece was the update before, drawn in between
+        self.last_piece_x = 0
+        self.last_piece_y = 0
+
+        # The next player's move, searched for a slice at a time while the
+        # active move animates
+        self.thinking = None
+        self.thinking_policy: Optional[SearchPolicy] = None
+        self.decision: Optional[int] = None
 
-        self.gameover = False
-        self.outcome = Outcome.DRAW
         self.finished = False
 
-        self.run_simulation = False
+        # The last full frame up to the moving piece, before what's drawn above
+        # it, see render()
+        self.static_frame: Optional[pygame.Surface] = None
+        self.static_frame_key = None
+        self.moving_piece_rect = pygame.Rect(0, 0, 0, 0)
 
-        self.player_made_move = True
+        self.run_simulation = False
+        self.speed = SIMULATION_SPEED
+        self.speed_text = self.render_speed_text()
+        self.next_speed = False
 
         self.hovered_flame = None
         self.hovered_square = None
@@ -271,12 +252,15 @@ class Game(Scene):
             {}
         )
         for i, colour in enumerate(flame_colours):
-            frames = SOUL_FLAMES[i * 12 : i * 12 + 6]
+            frames = assets.SOUL_FLAMES[i * 12 : i * 12 + 6]
             final_frames = [
-                pygame.transform.scale(f, self.square_size_tuple) for f in frames
+                sprite_cache.scale(
+                    f,
+                    self.square_size_tuple,
+                    clamp(i * (255 / (len(frames) - 1)), 0, 255),
+                )
+                for i, f in enumerate(frames)
             ]
-            for i in range(len(frames)):
-                final_frames[i].set_alpha(clamp(i * (255 / (len(frames) - 1)), 0, 255))
 
             final_frames.reverse()
             animation = AnimationPlayer("cast", final_frames, 0.1, False)
@@ -288,6 +272,7 @@ class Game(Scene):
     def handle_input(
         self, action_buffer: ActionBuffer, mouse_buffer: MouseBuffer
     ) -> None:
+        self.next_speed = action_buffer[Action.START][InputState.PRESSED]
         self.clicked = mouse_buffer[MouseButton.LEFT][InputState.PRESSED]
         self.dragging = mouse_buffer[MouseButton.LEFT][InputState.HELD]
         self.released = mouse_buffer[MouseButton.LEFT][InputState.RELEASED]
@@ -295,22 +280,23 @@ class Game(Scene):
     def update(self, dt: float) -> None:
         mouse_position = pygame.mouse.get_pos()
 
-        if self.moves_since_death == self.max_moves_since_death:
-            self.gameover = True
-
-        if self.gameover:
+        # Let the final move finish animating before ending the fight
+        if self.state.gameover and not self.active_move:
             if not self.finished:
-                print(self.outcome)
-                if self.outcome == Outcome.WIN:
-                    pygame.mixer.Channel(2).play(WIN_SFX)
-                elif self.outcome == Outcome.DRAW:
-                    pygame.mixer.Channel(2).play(STALEMATE_SFX)
-                elif self.outcome == Outcome.LOSE:
-                    pygame.mixer.Channel(2).play(LOST_SFX)
+                print(self.state.outcome)
+                if REPLAY_PATH is not None:
+                    with ReplayWriter(REPLAY_PATH) as writer:
+                        writer.write(Replay.from_state(self.state, globaldata.level))
+                if self.state.outcome == Outcome.WIN:
+                    pygame.mixer.Channel(2).play(assets.WIN_SFX)
+                elif self.state.outcome == Outcome.DRAW:
+                    pygame.mixer.Channel(2).play(assets.STALEMATE_SFX)
+                elif self.state.outcome == Outcome.LOSE:
+                    pygame.mixer.Channel(2).play(assets.LOST_SFX)
             self.finished = True
 
             if self.clicked:
-                if self.outcome == Outcome.WIN:
+                if self.state.outcome == Outcome.WIN:
                     globaldata.level += 1
                     globaldata.mana += self.mana_reward
                     if globaldata.level >= len(levels):
@@ -320,13 +306,60 @@ class Game(Scene):
                         return
                     else:
                         self.scene_manager.switch_scene(Game)
-                elif self.outcome == Outcome.DRAW or self.outcome == Outcome.LOSE:
+                elif (
+                    self.state.outcome == Outcome.DRAW
+                    or self.state.outcome == Outcome.LOSE
+                ):
                     globaldata.mana += self.mana_reward
                     self.scene_manager.switch_scene(Game)
             return
 
         if self.run_simulation:
-            self.move_speed_timer -= dt
+            if self.next_speed or (
+                self.clicked and self.start_button.inside(*mouse_position)
+            ):
+                speeds = list(Speed)
+                self.speed = speeds[(speeds.index(self.speed) + 1) % len(speeds)]
+                self.speed_text = self.render_speed_text()
+
+            if self.speed == Speed.RESOLVE:
+                # Nothing is drawn until the fight is over
+                self.active_move = None
+                while not self.state.gameover:
+                    self.play_turn()
+                return
+
+            if self.speed == Speed.MAX:
+                # Moves are played without animating them
+                self.active_move = None
+                captured = set()
+                while (
+                    not self.state.gameover
+                    and self.frame_ms_left(MAX_SPEED_FRAME_MS) > 0
+                ):
+                    played = self.play_turn()
+                    if played is not None and played[1] is not None:
+                        captured.add(played[1])
+                if Piece.KING in captured:
+                    pygame.mixer.Channel(1).play(assets.CHECKMATE_SFX)
+                elif captured:
+                    pygame.mixer.Channel(1).play(assets.CAPTURE_SFX)
+                return
+
+            # Frames that run several updates still only search for one slice
+            slice_ms = self.frame_ms_left(SEARCH_SLICE_MS)
+            if slice_ms > 0:
+                if self.thinking is not None:
+                    self.think_slice(slice_ms)
+                elif not self.state.gameover:
+                    # Nobody is searching, pick the next few random moves early
+                    self.state.speculate(slice_ms / 1000)
+
+            self.last_piece_x = self.active_piece_x
+            self.last_piece_y = self.active_piece_y
+
+            rate = FAST_FORWARD if self.speed == Speed.FAST else 1
+            self.move_speed_timer -= dt * rate
             if self.move_speed_timer > 0 and self.active_move:
                 # Lerp piece position
                 percent = (self.move_speed - self.move_speed_timer) / self.move_speed
@@ -346,87 +379,58 @@ class Game(Scene):
                 if self.active_move:
                     # Play sound effect for move and capture
                     if self.active_move.capture:
-                        pygame.mixer.Channel(1).play(CAPTURE_SFX)
+                        pygame.mixer.Channel(1).play(assets.CAPTURE_SFX)
 
                     # A player just lost... lol
                     if self.active_captured_piece == Piece.KING:
                         # Play sound effect player death
-                        pygame.mixer.Channel(1).play(CHECKMATE_SFX)
-
-                        self.alive_players[self.active_move.capture] = False
-                        self.moves_since_death = 0
-                        self.move_speed = self.starting_speed
-                        self.move_speed_timer = self.move_speed
+                        pygame.mixer.Channel(1).play(assets.CHECKMATE_SFX)
 
                     self.active_move = None
 
-                # Update turn
-                self.active_player = self.active_players[self.turn]
-
-                # Stalemate (No piece made a move for any player for a turn)
-                if (
-                    self.active_player == self.active_players[0]
-                    and not self.player_made_move
-                ):
-                    self.gameover = True
-
-                if self.active_player == self.active_players[0]:
-                    self.player_made_move = False
+                if self.state.gameover:
+                    return
 
-                if self.alive_players[self.active_player]:
-                    selected_move = pick_random_move(
-                        self.board, self.player_pieces, self.active_player
+                played = self.play_turn()
+                if played is not None:
+                    selected_move, self.active_captured_piece = played
+
+                    # Set piece to move
+                    self.active_move = decode_move(self.board, selected_move)
+                    self.active_piece = self.board[
+                        (self.active_move.target_x, self.active_move.target_y)
+                    ]
+
+                    self.active_piece_x = self.active_move.piece_x
+                    self.active_piece_y = self.active_move.piece_y
+                    self.last_piece_x = self.active_piece_x
+                    self.last_piece_y = self.active_piece_y
+
+                    self.move_speed = self.starting_speed * (
+                        1
+                        - self.state.moves_since_death
+                        / (self.state.max_moves_since_death / 4)
                     )
-                    if selected_move:
-                        self.player_made_move = True
-
-                        # Set piece to move
-                        self.active_move = selected_move
-                        self.active_piece = self.board[
-                            (self.active_move.piece_x, self.active_move.piece_y)
-                        ]
-
-                        self.active_captured_piece = play_move(
-                            self.board,
-                            self.player_pieces,
-                            self.active_player,
-                            self.active_move,
-                        )
-                        perform_capture(self.player_pieces, self.active_move)
-
-                        self.active_piece_x = self.active_move.piece_x
-                        self.active_piece_y = self.active_move.piece_y
+                    self.move_speed = clamp(self.move_speed, 0, self.starting_speed)
 
-                        self.moves += 1
-                        self.moves_since_death += 1
-                        self.move_speed = self.starting_speed * (
-                            1
-                            - self.moves_since_death / (self.max_moves_since_death / 4)
-                        )
-                        self.move_speed = clamp(self.move_speed, 0, self.starting_speed)
-                    else:
-                        # Can't make move
-                        # self.alive_players[self.active_player] = False
-                        pass
-
-                self.turn += 1
-                self.turn %= len(self.active_players)
                 self.move_speed_timer = self.move_speed
 
-                still_alive = []
-                for player, alive in self.alive_players.items():
-                    if alive:
-                        still_alive.append(player)
-
-                if self.active_players[0] not in still_alive:
-                    self.gameover = True
-                    self.outcome = Outcome.LOSE
-                    return
-
-                elif len(still_alive) == 1:
-                    self.gameover = True
-                    self.outcome = Outcome.WIN
-                    return
+                next_player = self.state.next_player
+                policy = self.state.policies.get(next_player)
+                if (
+                    not self.state.gameover
+                    and self.alive_players[next_player]
+                    and isinstance(policy, SearchPolicy)
+                ):
+                    self.thinking_policy = policy
+                    # Only sets the search up, frames send it how long to run
+                    self.thinking = policy.think(
+                        self.state,
+                        next_player,
+                        self.move_speed_timer * 1000 / rate,
+                        0,
+                    )
+                    self.think_slice(None)
         else:
             inside = False
 
@@ -455,38 +459,29 @@ class Game(Scene):
                     (mouse_position[0] - self.board_offset[0]) // self.square_size,
                     (mouse_position[1] - self.board_offset[1]) // self.square_size,
                 )
-                # If square inside player's region
-                region = self.player_regions[self.active_players[0]]
-                if (
-                    square[0] >= region[0]
-                    and square[0] < region[0] + region[2]
-                    and square[1] >= region[1]
-                    and square[1] < region[1] + region[3]
-                ):
-                    # If square not occupied or non-existant
-                    if square in self.board and self.board[square] is None:
-                        self.hovered_square = square
-                        # If mouse released
-                        if self.released:
-                            piece_type = self.hovered_flame.piece_type
-                            self.board[square] = piece_type
-                            self.player_pieces[self.active_players[0]].append(square)
-                            globaldata.mana -= self.hovered_flame.summon_cost
-
-                            pygame.mixer.Channel(1).play(SUMMON_SFX)
-
-                            self.mana_text = GAME_FONT.render(
-                                f"{globaldata.mana}", False, WHITE
-                            )
-
-                            pos, anim = self.summon_flames_vfx[piece_type]
-
-                            position = (
-                                square[0] * self.square_size + self.board_offset[0],
-                                square[1] * self.square_size + self.board_offset[1],
-                            )
-                            anim.reset()
-                            self.summon_flames_vfx[piece_type] = (position, anim)
+                # If square inside player's region and not occupied or non-existant
+                if self.state.can_summon(square):
+                    self.hovered_square = square
+                    # If mouse released
+                    if self.released:
+                        piece_type = self.hovered_flame.piece_type
+                        self.state.summon(square, piece_type)
+                        globaldata.mana -= self.hovered_flame.summon_cost
+
+                        pygame.mixer.Channel(1).play(assets.SUMMON_SFX)
+
+                        self.mana_text = GAME_FONT.render(
+                            f"{globaldata.mana}", False, WHITE
+                        )
+
+                        pos, anim = self.summon_flames_vfx[piece_type]
+
+                        position = (
+                            square[0] * self.square_size + self.board_offset[0],
+                            square[1] * self.square_size + self.board_offset[1],
+                        )
+                        anim.reset()
+                        self.summon_flames_vfx[piece_type] = (position, anim)
 
             if not self.dragging and not inside and self.hovered_flame is not None:
                 self.hovered_flame.animation.switch_animation("idle")
@@ -495,59 +490,112 @@ class Game(Scene):
             if self.clicked and self.start_button.inside(*mouse_position):
                 self.run_simulation = True
 
-    def render(self, surface: pygame.Surface) -> None:
-        self.transparent_surface.fill(self.transparent_colorkey)
-        surface.fill(BACKGROUND)
+    def play_turn(self) -> Optional[tuple[int, Optional[Piece]]]:
+        """Steps the game, waiting on the search if it hasn't decided yet."""
+
+        if self.thinking is not None:
+            self.thinking_policy.hurry()
+            self.decision = finish_thinking(self.thinking) or NO_MOVE
+            self.thinking = None
+        played = self.state.step(self.decision)
+        self.decision = None
+        return played
+
+    def think_slice(self, slice_ms: Optional[float]) -> None:
+        """Searches for up to slice_ms, keeping the move if the search ends."""
+
+        try:
+            self.thinking.send(slice_ms)
+        except StopIteration as stop:
+            self.thinking = None
+            self.decision = stop.value or NO_MOVE
+
+    def render_speed_text(self) -> pygame.Surface:
+        labels = {
+            Speed.NORMAL: "1X",
+            Speed.FAST: f"{FAST_FORWARD}X",
+            Speed.MAX: "MAX",
+            Speed.RESOLVE: "SKIP",
+        }
+        return GAME_FONT.render(labels[self.speed], False, WHITE)
 
-        background_rect = (
-            self.board_offset[0],
-            self.board_offset[1],
-            self.board_size[0] * self.square_size,
-            self.board_size[1] * self.square_size,
+    def render_board_layer(self) -> pygame.Surface:
+        layer = pygame.Surface(
+            (
+                self.board_size[0] * self.square_size,
+                self.board_size[1] * self.square_size,
+            )
+        ).convert()
+        layer.fill(EMPTY_SQUARE)
+        for square in self.board:
+            colour = LIGHT_SQUARE if (square[0] + square[1]) % 2 == 0 else DARK_SQUARE
+            position = (square[0] * self.square_size, square[1] * self.square_size)
+            pygame.draw.rect(layer, colour, (position, self.square_size_tuple))
+        return layer
+
+    def render(
+        self, surface: pygame.Surface, alpha: float
+    ) -> Optional[list[pygame.Rect]]:
+        # Only the moving piece changes between frames of a fight, until the
+        # next move or something else happens
+        frame_key = (
+            len(self.state.played_moves),
+            self.active_move is None,
+            self.speed,
+            self.finished,
         )
-        pygame.draw.rect(surface, EMPTY_SQUARE, background_rect)
+        if self.run_simulation and frame_key == self.static_frame_key:
+            if not self.active_move:
+                return []
+            last_rect = self.moving_piece_rect
+            self.moving_piece_rect = self.find_moving_piece_rect(alpha)
+            dirty_rect = last_rect.union(self.moving_piece_rect)
+
+            # Paint over where the piece was with what's under it, then draw
+            # the piece and everything above it again
+            surface.blit(self.static_frame, dirty_rect, dirty_rect)
+            surface.set_clip(dirty_rect)
+            self.render_moving_piece(surface)
+            self.render_overlays(surface)
+            surface.set_clip(None)
+            return [dirty_rect]
+        self.static_frame_key = frame_key if self.run_simulation else None
 
-        for square, piece in self.board.items():
-            colour = LIGHT_SQUARE if (square[0] + square[1]) % 2 == 0 else DARK_SQUARE
-            position = (
-                square[0] * self.square_size + self.board_offset[0],
-                square[1] * self.square_size + self.board_offset[1],
-            )
-            pygame.draw.rect(surface, colour, (position, self.square_size_tuple))
+        self.transparent_surface.fill(self.transparent_colorkey)
+        surface.fill(BACKGROUND)
+        surface.blit(self.board_layer, self.board_offset)
 
+        # Pieces are taller than a square, so they're drawn in board order for
+        # lower pieces to overlap the ones behind them
+        for square, piece in self.board.items():
             # There is a piece on the square
             if piece is not None:
-                for player_colour, piece_squares in self.player_pieces.items():
-                    # Skip if piece doesn't belong to this player
-                    if square not in piece_squares:
-                        continue
-
-                    # Don't render piece that is moving or piece that is captured
-                    if self.active_move and square == (
-                        self.active_move.target_x,
-                        self.active_move.target_y,
-                    ):
-                        continue
-
-                    piece_screen_pos = (
-                        square[0] * self.square_size
-                        + self.board_offset[0]
-                        + self.piece_offset[0],
-                        square[1] * self.square_size
-                        + self.board_offset[1]
-                        + self.piece_offset[1],
+                # Don't render piece that is moving or piece that is captured
+                if self.active_move and square == (
+                    self.active_move.target_x,
+                    self.active_move.target_y,
+                ):
+                    continue
+
+                player_colour = find_piece_colour(self.board, self.board.index(*square))
+                piece_screen_pos = (
+                    square[0] * self.square_size
+                    + self.board_offset[0]
+                    + self.piece_offset[0],
+                    square[1] * self.square_size
+                    + self.board_offset[1]
+                    + self.piece_offset[1],
+                )
+                if self.alive_players[player_colour]:
+                    surface.blit(
+                        self.player_piece_sprites[player_colour][piece.value],
+                        piece_screen_pos,
+                    )
+                else:
+                    surface.blit(
+                        self.player_piece_sprites[Colour.DEAD][piece.value],
+                        piece_screen_pos,
                     )
-                    if self.alive_players[player_colour]:
-                        surface.blit(
-                            self.player_piece_sprites[player_colour][piece.value],
-                            piece_screen_pos,
-                        )
-                    else:
-                        surface.blit(
-                            self.player_piece_sprites[Colour.DEAD][piece.value],
-                            piece_screen_pos,
-                        )
-                    break
 
         # Render captured piece
         if self.active_move and self.active_captured_piece:
@@ -574,21 +622,20 @@ class Game(Scene):
                     screen_pos,
                 )
 
-        # Render piece moving
         if self.active_move:
-            screen_pos = (
-                self.active_piece_x * self.square_size
-                + self.board_offset[0]
-                + self.piece_offset[0],
-                self.active_piece_y * self.square_size
-                + self.board_offset[1]
-                + self.piece_offset[1],
-            )
-            surface.blit(
-                self.player_piece_sprites[self.active_player][self.active_piece.value],
-                screen_pos,
-            )
+            # What's under the moving piece stays put until the move is done
+            if self.run_simulation and self.move_speed > 0:
+                self.static_frame = surface.copy()
+            else:
+                # The move ends on the next update, so the copy would go unused
+                self.static_frame_key = None
+            self.moving_piece_rect = self.find_moving_piece_rect(alpha)
+            self.render_moving_piece(surface)
+
+        self.render_overlays(surface)
+        return None
 
+    def render_overlays(self, surface: pygame.Surface) -> None:
         if not self.run_simulation:
             if self.hovered_square and self.hovered_flame:
                 square_pos = (
@@ -662,16 +709,20 @@ class Game(Scene):
                 blit_centered_text(surface, self.to_board_text, 68, 665)
                 blit_centered_text(surface, self.summon_text, 68, 680)
 
+        elif not self.finished:
+            self.start_button.render(surface, DARK_SQUARE, None)
+            blit_centered_text(surface, self.speed_text, *self.start_button.center)
+
         surface.blit(self.transparent_surface, (0, 0))
 
-        if self.gameover:
+        if self.finished:
             blit_centered_text(
                 surface,
                 self.fight_complete_text,
                 WINDOW_CENTRE[0],
                 WINDOW_CENTRE[1] - 80,
             )
-            if self.outcome == Outcome.WIN:
+            if self.state.outcome == Outcome.WIN:
                 blit_centered_text(
                     surface,
                     self.win_text,
@@ -684,7 +735,7 @@ class Game(Scene):
                     WINDOW_CENTRE[0],
                     WINDOW_CENTRE[1] + 70,
                 )
-            elif self.outcome == Outcome.DRAW:
+            elif self.state.outcome == Outcome.DRAW:
                 blit_centered_text(
                     surface,
                     self.draw_text,
@@ -697,7 +748,7 @@ class Game(Scene):
                     WINDOW_CENTRE[0],
                     WINDOW_CENTRE[1] + 70,
                 )
-            elif self.outcome == Outcome.LOSE:
+            elif self.state.outcome == Outcome.LOSE:
                 blit_centered_text(
                     surface,
                     self.lose_text,
@@ -716,3 +767,20 @@ class Game(Scene):
             WINDOW_CENTRE[0],
             WINDOW_HEIGHT - 34,
         )
+
+    def find_moving_piece_rect(self, alpha: float) -> pygame.Rect:
+        piece_x = lerp(self.last_piece_x, self.active_piece_x, alpha)
+        piece_y = lerp(self.last_piece_y, self.active_piece_y, alpha)
+        screen_pos = (
+            piece_x * self.square_size + self.board_offset[0] + self.piece_offset[0],
+            piece_y * self.square_size + self.board_offset[1] + self.piece_offset[1],
+        )
+        return self.moving_piece_sprite().get_rect(topleft=screen_pos)
+
+    def render_moving_piece(self, surface: pygame.Surface) -> None:
+        surface.blit(self.moving_piece_sprite(), self.moving_piece_rect)
+
+    def moving_piece_sprite(self) -> pygame.Surface:
+        return self.player_piece_sprites[self.state.active_player][
+            self.active_piece.value
+        ]
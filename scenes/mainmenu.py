@@ -5,8 +5,15 @@ from utilities.typehints import ActionBuffer, MouseBuffer
 from config.input import InputState, MouseButton
 from baseclasses.scenemanager import Scene, SceneManager
 from config.constants import WHITE, BACKGROUND
-from config.settings import WINDOW_WIDTH, WINDOW_HEIGHT, WINDOW_CENTRE
-from config.assets import CHESS_PIECES, GAME_FONT_BIG, GAME_FONT, GAME_FONT_SMALL
+from config.settings import WINDOW_WIDTH, WINDOW_HEIGHT, WINDOW_CENTRE, PREFETCH_MS
+from config.assets import (
+    CHESS_PIECES,
+    GAME_FONT_BIG,
+    GAME_FONT,
+    GAME_FONT_SMALL,
+    sprite_cache,
+    prefetch,
+)
 from components.button import blit_centered_text
 from components.fallingpieces import FallingSprite
 
@@ -21,7 +28,7 @@ class MainMenu(Scene):
         self.square_size = 100
         self.piece_size = (self.square_size, self.square_size / 2 * 3)
         self.scaled_pieces = [
-            pygame.transform.scale(sprite, self.piece_size) for sprite in CHESS_PIECES
+            sprite_cache.scale(sprite, self.piece_size) for sprite in CHESS_PIECES
         ]
         self.piece_offset = (0, -self.piece_size[1] // 2)
         falling_pieces = self.scaled_pieces
@@ -53,6 +60,11 @@ class MainMenu(Scene):
         )
         self.play_text = GAME_FONT.render("Click anywhere to play!", False, WHITE)
 
+        # Loads the game while the menu is up, clicking early still works but
+        # waits on whatever is left
+        self.loaded = 0.0
+        self.loading_text = self.render_loading_text()
+
     def handle_input(
         self, action_buffer: ActionBuffer, mouse_buffer: MouseBuffer
     ) -> None:
@@ -60,12 +72,21 @@ class MainMenu(Scene):
             self.scene_manager.switch_scene(scenes.game.Game)
 
     def update(self, dt: float) -> None:
+        if self.loaded < 1:
+            loaded = prefetch(scenes.game.Game.ASSETS, PREFETCH_MS / 1000)
+            if loaded != self.loaded:
+                self.loaded = loaded
+                self.loading_text = self.render_loading_text()
+
         for piece in self.pieces:
             piece.update(dt)
             if piece.rect.top > WINDOW_HEIGHT:
                 piece.rect.bottom = 0
 
-    def render(self, surface: pygame.Surface) -> None:
+    def render_loading_text(self) -> pygame.Surface:
+        return GAME_FONT_SMALL.render(f"Loading {self.loaded:.0%}", False, WHITE)
+
+    def render(self, surface: pygame.Surface, alpha: float) -> None:
         surface.fill(BACKGROUND)
 
         for piece in self.pieces:
@@ -86,5 +107,9 @@ class MainMenu(Scene):
         blit_centered_text(
             surface, self.play_text, WINDOW_CENTRE[0], WINDOW_CENTRE[1] + 200
         )
+        if self.loaded < 1:
+            blit_centered_text(
+                surface, self.loading_text, WINDOW_CENTRE[0], WINDOW_CENTRE[1] + 250
+            )
 
         surface.blit(self.credits_text, (0, 0))
@@ -6,7 +6,7 @@ from config.input import InputState, MouseButton
 from baseclasses.scenemanager import Scene, SceneManager
 from config.settings import WINDOW_CENTRE, WINDOW_HEIGHT, WINDOW_WIDTH
 from config.constants import WHITE, BACKGROUND
-from config.assets import GAME_FONT_BIG, GAME_FONT, CHESS_PIECES
+from config.assets import GAME_FONT_BIG, GAME_FONT, CHESS_PIECES, sprite_cache
 from components.button import blit_centered_text
 from components.fallingpieces import FallingSprite
 
@@ -21,7 +21,7 @@ class Win(Scene):
         self.square_size = 100
         self.piece_size = (self.square_size, self.square_size / 2 * 3)
         self.scaled_pieces = [
-            pygame.transform.scale(sprite, self.piece_size) for sprite in CHESS_PIECES
+            sprite_cache.scale(sprite, self.piece_size) for sprite in CHESS_PIECES
         ]
         self.piece_offset = (0, -self.piece_size[1] // 2)
         falling_pieces = self.scaled_pieces
@@ -62,7 +62,7 @@ class Win(Scene):
             if piece.rect.top > WINDOW_HEIGHT:
                 piece.rect.bottom = 0
 
-    def render(self, surface: pygame.Surface) -> None:
+    def render(self, surface: pygame.Surface, alpha: float) -> None:
         surface.fill(BACKGROUND)
 
         for piece in self.pieces:
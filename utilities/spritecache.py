@@ -0,0 +1,77 @@
+from typing import Optional
+from collections import OrderedDict
+import pygame
+
+DEFAULT_SPRITE_CACHE_MB = 32
+
+# Source sprite, size and alpha of a scaled copy
+SpriteKey = tuple[pygame.Surface, tuple[int, int], Optional[int]]
+
+
+def surface_bytes(surface: pygame.Surface) -> int:
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+class SpriteCache:
+    """
+    Scaled copies of sprites shared between scenes, so switching scenes
+    doesn't scale the same sprites again. The least recently used copies are
+    dropped once they take up more than the memory cap.
+
+    Copies are shared, so callers must copy them before drawing onto them or
+    changing their alpha.
+    """
+
+    def __init__(self, megabytes: float = DEFAULT_SPRITE_CACHE_MB) -> None:
+        self.max_bytes = int(megabytes * 1024 * 1024)
+        self.bytes = 0
+        self.sprites: OrderedDict[SpriteKey, pygame.Surface] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.sprites)
+
+    def scale(
+        self,
+        sprite: pygame.Surface,
+        size: tuple[float, float],
+        alpha: Optional[float] = None,
+    ) -> pygame.Surface:
+        size = (int(size[0]), int(size[1]))
+        if alpha is not None:
+            alpha = int(alpha)
+        key = (sprite, size, alpha)
+
+        scaled = self.get(key)
+        if scaled is None:
+            scaled = pygame.transform.scale(sprite, size)
+            if alpha is not None:
+                scaled.set_alpha(alpha)
+            self.add(key, scaled)
+        return scaled
+
+    def get(self, key: SpriteKey) -> Optional[pygame.Surface]:
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.sprites.move_to_end(key)
+        return sprite
+
+    def add(self, key: SpriteKey, sprite: pygame.Surface) -> None:
+        self.sprites[key] = sprite
+        self.bytes += surface_bytes(sprite)
+
+        # Always keep the sprite just asked for, even if it's over the cap
+        while self.bytes > self.max_bytes and len(self.sprites) > 1:
+            _, evicted = self.sprites.popitem(last=False)
+            self.bytes -= surface_bytes(evicted)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self.sprites.clear()
+        self.bytes = 0
@@ -1,32 +1,105 @@
+from typing import Optional
+from pathlib import Path
+import hashlib
+import json
 import pygame
 
 
-def slice_sheet(
-    path: str, sprite_width: int, sprite_height: int
+# Sheets sliced once, then saved with an index so later launches read one image
+# and cut it up with subsurfaces. Atlases are stored as raw RGBA at the sheet's
+# own resolution, since decoding a PNG (or reading an upscaled copy) took longer
+# than slicing the sheet did
+BAKED_DIRECTORY = Path("assets/baked")
+ATLAS_VERSION = 2
+
+
+def load_atlas(
+    path: str,
+    sprite_width: int,
+    sprite_height: int,
+    size: Optional[tuple[int, int]] = None,
 ) -> list[pygame.Surface]:
+    """
+    The sheet's sprites, scaled to size if given, as subsurfaces of a single
+    atlas. The atlas is baked again whenever the sheet changes.
+    """
+
+    source_hash = hash_sheet(path, sprite_width, sprite_height)
+    name = f"{Path(path).stem}_{sprite_width}x{sprite_height}"
+    atlas_path = BAKED_DIRECTORY / f"{name}.rgba"
+    index_path = BAKED_DIRECTORY / f"{name}.json"
+
+    atlas = None
+    try:
+        index = json.loads(index_path.read_text())
+        if index["version"] == ATLAS_VERSION and index["hash"] == source_hash:
+            atlas = pygame.image.frombuffer(
+                atlas_path.read_bytes(), tuple(index["size"]), "RGBA"
+            )
+    except (OSError, ValueError, KeyError, pygame.error):
+        # Missing, stale or cut short, so bake it again
+        atlas = None
+
+    if atlas is None:
+        atlas, rects = bake_atlas(path, sprite_width, sprite_height)
+        index = {
+            "version": ATLAS_VERSION,
+            "hash": source_hash,
+            "size": list(atlas.get_size()),
+            "rects": rects,
+        }
+        try:
+            BAKED_DIRECTORY.mkdir(parents=True, exist_ok=True)
+            atlas_path.write_bytes(pygame.image.tobytes(atlas, "RGBA"))
+            index_path.write_text(json.dumps(index) + "\n")
+        except OSError:
+            # Read only file system, bake again next launch
+            pass
+
+    atlas = atlas.convert_alpha()
+    rects = index["rects"]
+    if size is None or size == (sprite_width, sprite_height):
+        return [atlas.subsurface(rect) for rect in rects]
+
+    if size[0] % sprite_width or size[1] % sprite_height:
+        # Scaling the whole atlas would bleed pixels across sprite edges
+        return [pygame.transform.scale(atlas.subsurface(rect), size) for rect in rects]
+
+    # Whole multiples scale every sprite exactly as scaling it alone would
+    x_scale = size[0] // sprite_width
+    y_scale = size[1] // sprite_height
+    atlas = pygame.transform.scale(
+        atlas, (atlas.get_width() * x_scale, atlas.get_height() * y_scale)
+    )
+    return [
+        atlas.subsurface((x * x_scale, y * y_scale, size[0], size[1]))
+        for x, y, _, _ in rects
+    ]
+
+
+def bake_atlas(
+    path: str, sprite_width: int, sprite_height: int
+) -> tuple[pygame.Surface, list[list[int]]]:
+    """Returns: The sheet's sprites laid out in the same grid, and their rects."""
+
     sprite_sheet = pygame.image.load(path)
     rows = int(sprite_sheet.get_height() / sprite_height)
     columns = int(sprite_sheet.get_width() / sprite_width)
 
-    sprites = []
+    atlas = pygame.Surface(
+        (columns * sprite_width, rows * sprite_height), pygame.SRCALPHA
+    )
+    rects = []
     for y in range(rows):
         for x in range(columns):
-            sprites.append(
-                get_sprite_from_sheet(
-                    sprite_sheet,
-                    x * sprite_width,
-                    y * sprite_height,
-                    sprite_width,
-                    sprite_height,
-                )
-            )
-    return sprites
+            rect = [x * sprite_width, y * sprite_height, sprite_width, sprite_height]
+            # Blitting onto a clear surface copies the pixels unblended
+            atlas.blit(sprite_sheet, rect[:2], rect)
+            rects.append(rect)
+    return atlas, rects
 
 
-def get_sprite_from_sheet(
-    sprite_sheet: pygame.Surface, x: int, y: int, width: int, height: int
-) -> pygame.Surface:
-    sprite = pygame.Surface((width, height), pygame.SRCALPHA)
-    sprite.blit(sprite_sheet, (0, 0), (x, y, width, height))
-    sprite = sprite.convert_alpha()
-    return sprite
+def hash_sheet(path: str, sprite_width: int, sprite_height: int) -> str:
+    sha = hashlib.sha256(Path(path).read_bytes())
+    sha.update(repr((sprite_width, sprite_height)).encode())
+    return sha.hexdigest()